@@ -17,10 +17,15 @@ except ImportError:
     print("ERRORE: Manca 'python-louvain'. Installalo con: pip install python-louvain")
     sys.exit(1)
 
+# Lettura tipizzata delle tabelle della pipeline: stesso schema e stessa scelta
+# Parquet/CSV di Vinted_env/dataset_io.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Vinted_env"))
+from dataset_io import HAS_PARQUET, read_table
+
 # =========================================================
 # CONFIGURAZIONE
 # =========================================================
-INPUT_DATASET = "vinted_dataset_FINAL.csv" 
+INPUT_DATASET = "vinted_dataset_FINAL.csv" # Letto dal .parquet accanto se aggiornato
 OUTPUT_DIR = "ASNM_ANALYSIS_RESULTS_FINAL"
 OUTPUT_GRAPH_FILE = os.path.join(OUTPUT_DIR, "vinted_graph_FINAL.gexf")
 SEED = 42
@@ -38,6 +43,14 @@ def ensure_dir(d):
     if not os.path.exists(d):
         os.makedirs(d, exist_ok=True)
 
+def save_report(df: pd.DataFrame, name: str, index: bool = True):
+    """
+    Salva un report in CSV e, se pyarrow è disponibile, anche in Parquet (tipi preservati).
+    """
+    df.to_csv(os.path.join(OUTPUT_DIR, name + ".csv"), index=index)
+    if HAS_PARQUET:
+        df.to_parquet(os.path.join(OUTPUT_DIR, name + ".parquet"), index=index)
+
 # =========================================================
 # 1. LOAD E COSTRUZIONE GRAFO
 # =========================================================
@@ -338,6 +351,8 @@ def run_incongruence_analysis(df_archi: pd.DataFrame, output_dir: str):
         df_inc = df_validi[df_validi['Scarto'] >= 2]
         print(f"Trovate {len(df_inc)} incongruenze (scarto >= 2) su {len(df_validi)} coppie valide.")
         df_inc.to_csv(os.path.join(output_dir, "report_incongruenze.csv"), index=False)
+        if HAS_PARQUET:
+            df_inc.to_parquet(os.path.join(output_dir, "report_incongruenze.parquet"), index=False)
     else:
         print("Nessuna coppia di rating valida per l'analisi delle incongruenze.")
 
@@ -353,7 +368,7 @@ def main():
     # 1. Load
     print(f"Caricamento {INPUT_DATASET}...")
     try:
-        df_archi = pd.read_csv(INPUT_DATASET)
+        df_archi = read_table(INPUT_DATASET)
     except Exception as e:
         print(e); sys.exit(1)
     G = build_graph(df_archi)
@@ -365,7 +380,7 @@ def main():
 
     # 3. Centrality
     df_nodes = calculate_centralities(G, K_CENTRALITY, SEED)
-    df_nodes.to_csv(os.path.join(OUTPUT_DIR, "report_centralita.csv"))
+    save_report(df_nodes, "report_centralita")
     
     # 4. Communities
     partition, mod = run_community_detection(G, SEED)
@@ -377,8 +392,8 @@ def main():
     df_nodes = naming_communities(df_nodes)
     
 
-    df_comm.to_csv(os.path.join(OUTPUT_DIR, "report_communities.csv"))
-    df_nodes.to_csv(os.path.join(OUTPUT_DIR, "report_nodi_completo.csv"))
+    save_report(df_comm, "report_communities")
+    save_report(df_nodes, "report_nodi_completo")
     print(f"\n Report nodi completo salvato.")
 
 
@@ -398,7 +413,7 @@ def main():
         {"Strategy": "Top Out-Degree (Hubs)", "Seeds": top_deg, "Spread": spread_deg},
         {"Strategy": "Top PageRank (Authority)", "Seeds": top_pr, "Spread": spread_pr}
     ]
-    pd.DataFrame(im_results).to_csv(os.path.join(OUTPUT_DIR, "report_influence_maximization.csv"), index=False)
+    save_report(pd.DataFrame(im_results), "report_influence_maximization", index=False)
     print(pd.DataFrame(im_results))
 
     # 6. Incongruenze
@@ -0,0 +1,311 @@
+import argparse
+import base64
+import cProfile
+import gc
+import gzip
+import json
+import logging
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+from dacite import from_dict
+
+from vinted import Vinted
+from vinted.cassette import Cassette
+from vinted.decoders import compile_decoder, decode
+from vinted.description import extract_description
+from vinted.endpoints import Endpoints
+from vinted.models.filters import FiltersResponse, InitializersResponse
+from vinted.models.items import ItemsResponse, UserItemsResponse
+from vinted.models.search import SearchResponse, SearchSuggestionsResponse, UserSearchResponse
+from vinted.models.users import UserFeedbacksResponse, UserFeedbacksSummaryResponse, UserResponse
+
+# ========================================================================
+# CONFIGURAZIONE
+# ========================================================================
+
+# Modello di risposta per ogni endpoint (come in vinted.Vinted)
+RESPONSE_MODELS = {
+    Endpoints.CATALOG_ITEMS: SearchResponse,
+    Endpoints.CATALOG_FILTERS: FiltersResponse,
+    Endpoints.CATALOG_INITIALIZERS: InitializersResponse,
+    Endpoints.ITEMS: ItemsResponse,
+    Endpoints.USERS: UserSearchResponse,
+    Endpoints.USER: UserResponse,
+    Endpoints.USER_FEEDBACKS: UserFeedbacksResponse,
+    Endpoints.USER_ITEMS: UserItemsResponse,
+    Endpoints.USER_FEEDBACKS_SUMMARY: UserFeedbacksSummaryResponse,
+    Endpoints.SEARCH_SUGGESTIONS: SearchSuggestionsResponse,
+}
+
+ENDPOINT_PATTERNS = [
+    (re.compile("^/api/v2" + re.escape(e.value).replace(r"\{\}", "([^/]+)") + "$"), e)
+    for e in Endpoints
+]
+
+# Configurazioni di logging confrontate da "logging": (nome, livello, campionamento)
+LOGGING_CONFIGS = [
+    ("WARNING (spento)", logging.WARNING, 1),
+    ("INFO", logging.INFO, 1),
+    ("INFO 1/100", logging.INFO, 100),
+    ("DEBUG", logging.DEBUG, 1),
+]
+
+# Descrizioni malformate confrontate da "descriptions": tag non chiusi, chiusure
+# senza apertura, script con "</div>" nel testo. L'estrazione deve fermarsi al </div>
+# del div della descrizione come BeautifulSoup.
+DESCRIPTION_CASES = [
+    '<div itemprop="description"><p>unclosed para<div>more</div></div><p>footer text</p>',
+    '<div itemprop="description"><ul><li>one<li>two</ul></div>tail',
+    '<div itemprop="description">one<p>two</div>tail',
+    '<div itemprop="description"><p>unclosed para</div>more</div><footer>footer text</footer>',
+    '<div itemprop="description"><b>a<i>b</b>c</i>d</div>e',
+    '<div itemprop="description"></span>x</p>y</div>z',
+    '<div itemprop="description"><script>var a="</div>";</script>ok<br>line</div>after',
+    '<div itemprop="description"><div>in<div>deep</div></div>last</div>out',
+    '<div itemprop="description">&amp; <style>p{}</style>styled<template><p>t</p></template>x</div>y',
+    '<div itemprop="description"><table><tr><td>c1<td>c2</table></div>t',
+    '<html><body><div class="x" itemprop="description">testo</div><div>altro</div></body></html>',
+    '<html><body><div>nessuna descrizione</div></body></html>',
+]
+
+# ========================================================================
+# UTILITY
+# ========================================================================
+
+def load_bodies(cassette_path: str) -> List[Tuple[Endpoints, bytes]]:
+    """
+    Estrae dalla cassette (vinted.cassette) i body JSON delle risposte 200
+    e li associa al relativo endpoint.
+    """
+    bodies = []
+    with gzip.open(cassette_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            episode = json.loads(line)
+            if episode["status"] != 200:
+                continue
+            path = urlparse(episode["url"]).path
+            for pattern, endpoint in ENDPOINT_PATTERNS:
+                if pattern.match(path):
+                    bodies.append((endpoint, base64.b64decode(episode["body"])))
+                    break
+    return bodies
+
+def load_requests(cassette_path: str) -> Tuple[str, List[Tuple[Endpoints, Optional[str], Dict[str, str]]]]:
+    """
+    Ricostruisce dalla cassette le chiamate API registrate: dominio e, per ogni
+    risposta 200, (endpoint, valore del path, parametri della query).
+    """
+    domain = None
+    requests = []
+    with gzip.open(cassette_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            episode = json.loads(line)
+            if episode["status"] != 200:
+                continue
+            url = urlparse(episode["url"])
+            domain = domain or url.netloc.rsplit(".", 1)[-1]
+            for pattern, endpoint in ENDPOINT_PATTERNS:
+                match = pattern.match(url.path)
+                if match:
+                    format_value = match.group(1) if match.groups() else None
+                    requests.append((endpoint, format_value, dict(parse_qsl(url.query, keep_blank_values=True))))
+                    break
+    return domain, requests
+
+def load_payloads(cassette_path: str) -> List[Tuple[Endpoints, Any]]:
+    payloads = []
+    for endpoint, body in load_bodies(cassette_path):
+        try:
+            payloads.append((endpoint, json.loads(body)))
+        except ValueError:
+            pass  # pagine HTML (handshake, descrizioni)
+    return payloads
+
+def time_decoder(func, model, payloads: List[Any], repeat: int) -> Tuple[float, int]:
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            try:
+                func(model, payload)
+            except Exception:
+                errors += 1
+    return time.perf_counter() - start, errors // repeat
+
+# ========================================================================
+# BENCHMARK
+# ========================================================================
+
+def bench_decoders(cassette_path: str, repeat: int):
+    payloads = load_payloads(cassette_path)
+    print(f"Payload caricati: {len(payloads)} da {cassette_path}")
+
+    by_endpoint: Dict[Endpoints, List[Any]] = {}
+    for endpoint, payload in payloads:
+        by_endpoint.setdefault(endpoint, []).append(payload)
+
+    print(f"\n{'Endpoint':<28}{'N':>6}{'dacite (ms)':>14}{'compilato (ms)':>17}{'speed-up':>10}{'errori d/c':>12}")
+    for endpoint, items in by_endpoint.items():
+        model = RESPONSE_MODELS[endpoint]
+        compile_decoder(model)  # la generazione del decoder non entra nella misura
+        t_dacite, err_dacite = time_decoder(from_dict, model, items, repeat)
+        t_compiled, err_compiled = time_decoder(decode, model, items, repeat)
+        n = len(items) * repeat
+        print(f"{endpoint.name:<28}{len(items):>6}{t_dacite / n * 1000:>14.3f}{t_compiled / n * 1000:>17.3f}"
+              f"{t_dacite / t_compiled:>9.1f}x{f'{err_dacite}/{err_compiled}':>12}")
+
+def retained_memory(build, bodies: List[bytes]) -> int:
+    """
+    Byte ancora allocati dopo aver costruito (e tenuto in memoria) gli oggetti
+    di tutte le risposte: il JSON intermedio viene liberato come nel client.
+    """
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(body) for body in bodies]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+def bench_memory(cassette_path: str):
+    by_endpoint: Dict[Endpoints, List[bytes]] = {}
+    for endpoint, body in load_bodies(cassette_path):
+        by_endpoint.setdefault(endpoint, []).append(body)
+
+    print(f"\n{'Endpoint':<28}{'N':>6}{'JSON (KB)':>12}{'modelli (KB)':>15}{'rapporto':>10}")
+    for endpoint, bodies in by_endpoint.items():
+        model = RESPONSE_MODELS[endpoint]
+        try:
+            decode(model, json.loads(bodies[0]))  # riscaldamento: decoder e stringhe internate
+        except Exception as e:
+            print(f"{endpoint.name:<28} saltato ({e})")
+            continue
+        mem_json = retained_memory(json.loads, bodies)
+        mem_models = retained_memory(lambda body: decode(model, json.loads(body)), bodies)
+        print(f"{endpoint.name:<28}{len(bodies):>6}{mem_json / len(bodies) / 1024:>12.1f}"
+              f"{mem_models / len(bodies) / 1024:>15.1f}{mem_models / mem_json:>9.2f}x")
+
+def run_workload(vinted: Vinted, requests, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for endpoint, format_value, params in requests:
+            vinted._get(endpoint, RESPONSE_MODELS[endpoint], format_value, params=params)
+    return time.perf_counter() - start
+
+def bench_logging(cassette_path: str, repeat: int, profile: bool):
+    """
+    Ripete le chiamate registrate attraverso il client completo (_get, _call,
+    cassette in replay) con diverse configurazioni di logging, scrivendo i log
+    su /dev/null: la differenza rispetto a WARNING è il costo del logging.
+    """
+    domain, requests = load_requests(cassette_path)
+    print(f"Richieste caricate: {len(requests)} da {cassette_path}")
+
+    vinted = Vinted(domain=domain, cassette=Cassette(cassette_path, mode="replay"))
+    vinted.cookies = {}  # nessun handshake: non serve in replay
+
+    vinted_logger = logging.getLogger("vinted")
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    vinted_logger.addHandler(handler)
+    vinted_logger.propagate = False
+
+    run_workload(vinted, requests, 1)  # riscaldamento: decoder compilati, stringhe internate
+    n = len(requests) * repeat
+    baseline = None
+    print(f"\n{'Logging':<20}{'us/richiesta':>14}{'overhead':>12}")
+    for name, level, sample_every in LOGGING_CONFIGS:
+        vinted.set_log_level(level)
+        vinted.set_log_sampling(sample_every)
+        elapsed = run_workload(vinted, requests, repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<20}{elapsed / n * 1e6:>14.1f}{(elapsed - baseline) / baseline * 100:>11.1f}%")
+
+        if profile and level == logging.INFO and sample_every == 1:
+            profiler = cProfile.Profile()
+            profiler.runcall(run_workload, vinted, requests, repeat)
+            pstats.Stats(profiler).sort_stats("tottime").print_stats(12)
+
+    vinted_logger.removeHandler(handler)
+    vinted_logger.propagate = True
+
+def bench_descriptions(html_paths: List[str]):
+    """
+    Confronta extract_description() con BeautifulSoup (builder html.parser, come lo
+    scraper prima del parser incrementale) sui casi malformati di DESCRIPTION_CASES
+    e sulle pagine HTML passate, riportando le differenze e i tempi.
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        print("ERRORE: serve beautifulsoup4 per il confronto (pip install beautifulsoup4).")
+        return
+
+    def with_bs4(html: str) -> Optional[str]:
+        div = BeautifulSoup(html, "html.parser").find("div", {"itemprop": "description"})
+        return div.get_text(strip=True) if div else None
+
+    pages = [(f"caso {i}", html) for i, html in enumerate(DESCRIPTION_CASES, 1)]
+    for path in html_paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+
+    mismatches = 0
+    time_bs4 = time_parser = 0.0
+    for name, html in pages:
+        start = time.perf_counter()
+        expected = with_bs4(html)
+        time_bs4 += time.perf_counter() - start
+        start = time.perf_counter()
+        got = extract_description(html)
+        time_parser += time.perf_counter() - start
+        if got != expected:
+            mismatches += 1
+            print(f"DIVERSO {name}: BeautifulSoup={expected!r} parser={got!r}")
+
+    print(f"\nPagine confrontate: {len(pages)}, differenze: {mismatches}")
+    print(f"BeautifulSoup: {time_bs4 * 1e3:.1f} ms, parser incrementale: {time_parser * 1e3:.1f} ms")
+
+# ========================================================================
+# ESECUZIONE
+# ========================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline del client Vinted su una cassette registrata.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p_decoders = subparsers.add_parser("decoders", help="dacite.from_dict contro i decoder compilati")
+    p_decoders.add_argument("cassette", help="file .jsonl.gz registrato con VINTED_CASSETTE_MODE=record")
+    p_decoders.add_argument("--repeat", type=int, default=5)
+
+    p_memory = subparsers.add_parser("memory", help="memoria trattenuta da JSON grezzo e modelli decodificati")
+    p_memory.add_argument("cassette", help="file .jsonl.gz registrato con VINTED_CASSETTE_MODE=record")
+
+    p_logging = subparsers.add_parser("logging", help="costo del logging sul percorso delle richieste")
+    p_logging.add_argument("cassette", help="file .jsonl.gz registrato con VINTED_CASSETTE_MODE=record")
+    p_logging.add_argument("--repeat", type=int, default=20)
+    p_logging.add_argument("--profile", action="store_true", help="profilo cProfile della configurazione INFO")
+
+    p_descriptions = subparsers.add_parser("descriptions", help="descrizioni estratte contro BeautifulSoup")
+    p_descriptions.add_argument("pages", nargs="*", help="pagine HTML di articoli da confrontare oltre ai casi malformati")
+
+    args = parser.parse_args()
+    if args.command == "decoders":
+        bench_decoders(args.cassette, args.repeat)
+    elif args.command == "memory":
+        bench_memory(args.cassette)
+    elif args.command == "logging":
+        bench_logging(args.cassette, args.repeat, args.profile)
+    elif args.command == "descriptions":
+        bench_descriptions(args.pages)
@@ -0,0 +1,111 @@
+import logging
+import os
+
+from vinted import Vinted
+from vinted.cassette import Cassette
+from vinted.feedback_store import FeedbackStore
+from vinted.metrics import Metrics
+from vinted.ratelimit import AdaptiveRateLimiter
+from vinted.session import SessionManager
+
+# ========================================================================
+# CONFIGURAZIONE COMUNE AGLI SCRIPT DI CRAWLING
+# ========================================================================
+#
+# Sessione, rate limiter, cassette, metriche, log e pagine di feedback sono gli
+# stessi per scrape_test_FINAL.py e get_recensioni_venditori_FINAL.py: si configurano
+# con le variabili d'ambiente qui sotto e i due script li creano da qui.
+
+# Cookie di sessione condivisi tra gli script (file JSON rinnovato in automatico).
+# Un cookie copiato dal browser si può forzare con VINTED_COOKIE_STRING="a=1; b=2"
+COOKIES_PATH = os.environ.get("VINTED_COOKIES", "vinted_cookies_it.json")
+RAW_COOKIE_STRING = os.environ.get("VINTED_COOKIE_STRING")
+
+# Rate limiter adattivo (richieste/secondo): accelera finché le risposte sono 200,
+# rallenta e si ferma per RATE_PENALTY secondi su 429/403. Ritmo iniziale e massimo
+# li sceglie ogni script
+RATE_MIN = 1 / 60
+RATE_PENALTY = 120
+
+# Pagine di feedback già scaricate, condivise tra gli script (crawling, tagging,
+# contro-recensioni): una pagina più recente di FEEDBACK_MAX_AGE_DAYS giorni viene
+# letta dal file invece di essere riscaricata
+FEEDBACK_STORE_PATH = os.environ.get("VINTED_FEEDBACK_STORE", "vinted_feedbacks.sqlite")
+FEEDBACK_MAX_AGE_DAYS = float(os.environ.get("VINTED_FEEDBACK_MAX_AGE_DAYS", "30"))
+
+# Cassette record/replay (vedi create_cassette)
+CASSETTE_PATH = os.environ.get("VINTED_CASSETTE")
+CASSETTE_MODE = os.environ.get("VINTED_CASSETTE_MODE", "replay")
+CASSETTE_LATENCY = os.environ.get("VINTED_CASSETTE_LATENCY")
+
+# Metriche delle richieste (latenza, byte, parsing, attese del rate limiter):
+# VINTED_METRICS=<file.prom> (formato Prometheus) oppure <file.json>
+METRICS_PATH = os.environ.get("VINTED_METRICS")
+
+# I log del client sono spenti di default (solo avvisi ed errori): VINTED_LOG_LEVEL=INFO
+# li riattiva, VINTED_LOG_SAMPLE=100 ne stampa uno ogni 100 richieste
+LOG_LEVEL = os.environ.get("VINTED_LOG_LEVEL", "WARNING")
+LOG_SAMPLE = int(os.environ.get("VINTED_LOG_SAMPLE", "1"))
+
+# ========================================================================
+# UTILITY
+# ========================================================================
+
+def create_session() -> SessionManager:
+    """
+    Cookie jar salvato su COOKIES_PATH e condiviso con gli altri script: l'handshake
+    con Vinted avviene solo alla prima richiesta e solo se i cookie salvati sono
+    scaduti; un thread in background li rinnova prima della scadenza.
+    """
+    session = SessionManager(COOKIES_PATH, background_refresh=True)
+    if RAW_COOKIE_STRING:
+        session.set(RAW_COOKIE_STRING)
+    return session
+
+def setup_logging() -> None:
+    logging.basicConfig(
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        level=LOG_LEVEL,
+    )
+
+def create_metrics() -> Metrics | None:
+    return Metrics() if METRICS_PATH else None
+
+def export_metrics(vinted: Vinted) -> None:
+    """
+    Scrive le metriche su METRICS_PATH (se attivo), insieme ai salvataggi incrementali.
+    """
+    if vinted.metrics is None:
+        return
+    if METRICS_PATH.endswith(".json"):
+        vinted.metrics.write_json(METRICS_PATH)
+    else:
+        vinted.metrics.write_prometheus(METRICS_PATH)
+
+def create_feedback_store() -> FeedbackStore:
+    return FeedbackStore(FEEDBACK_STORE_PATH, max_age=FEEDBACK_MAX_AGE_DAYS * 24 * 3600)
+
+def create_cassette() -> Cassette | None:
+    """
+    Cassette opzionale per eseguire lo scraping offline (benchmark ripetibili).
+    Si attiva con VINTED_CASSETTE=<file.jsonl.gz> e VINTED_CASSETTE_MODE=record|replay;
+    VINTED_CASSETTE_LATENCY (secondi oppure "recorded") simula la latenza in replay.
+    """
+    if not CASSETTE_PATH:
+        return None
+    latency = CASSETTE_LATENCY
+    if latency and latency != "recorded":
+        latency = float(latency)
+    return Cassette(CASSETTE_PATH, mode=CASSETTE_MODE, latency=latency)
+
+def create_rate_limiter(rate: float, max_rate: float, increase: float) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        rate=rate,
+        min_rate=RATE_MIN,
+        max_rate=max_rate,
+        increase=increase,
+        decrease=0.5,
+        penalty=RATE_PENALTY,
+        jitter=0.3,
+    )
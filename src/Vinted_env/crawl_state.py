@@ -0,0 +1,478 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# ========================================================================
+# STATO PERSISTENTE DEL CRAWLING (SQLite in modalità WAL)
+# ========================================================================
+#
+# Fasi del crawling:
+#   "seed" -> scarico TUTTE le pagine di feedback di un seed (archi del grafo)
+#   "tag"  -> scarico le prime pagine di feedback di un nodo per assegnargli i tag
+#
+# Ogni utente ha, per ogni fase, uno stato: pending -> in_progress -> done | failed.
+# Le pagine di un seed vengono salvate una alla volta, nella stessa transazione che
+# aggiorna last_page: dopo un crash si riparte dalla pagina successiva all'ultima
+# salvata, senza riscaricare nulla e senza rileggere i CSV.
+#
+# Ogni arco ricorda la fase che l'ha trovato (hop): "seed" per le pagine dei seed,
+# "tag" per le pagine scaricate durante il tagging degli altri nodi.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    is_seed INTEGER NOT NULL DEFAULT 0,
+    main_tag TEXT,
+    detailed_tag TEXT,
+    discovered_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    user_id INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_page INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    error TEXT,
+    PRIMARY KEY (user_id, phase)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (phase, status);
+CREATE TABLE IF NOT EXISTS edges (
+    buyer_id INTEGER,
+    seller_id INTEGER,
+    item_id INTEGER,
+    rating_buyer INTEGER,
+    rating_seller INTEGER,
+    item_title TEXT,
+    fetched_at REAL NOT NULL,
+    hop TEXT NOT NULL DEFAULT 'seed'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS edges_key ON edges (buyer_id, seller_id, IFNULL(item_id, -1));
+CREATE INDEX IF NOT EXISTS edges_seller ON edges (seller_id);
+CREATE TABLE IF NOT EXISTS tag_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    main_tag TEXT,
+    detailed_tag TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return None if value is None or pd.isna(value) else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CrawlState:
+    def __init__(self, path: str = "vinted_crawl_state.sqlite", max_attempts: int = 3) -> None:
+        """
+        Frontiera e stato del crawler in un database SQLite (WAL: letture concorrenti
+        e scritture atomiche anche se il processo viene interrotto).
+
+        Contiene gli utenti scoperti con i loro tag, lo stato per fase (tentativi,
+        ultima pagina scaricata, timestamp, ultimo errore) e gli archi
+        (acquirente, venditore, oggetto), deduplicati dall'indice univoco.
+        Un utente fallito viene ritentato finché i tentativi sono meno di max_attempts.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(edges)")}
+        if "hop" not in columns:
+            # Stato creato prima della colonna: gli archi esistenti vengono dai seed
+            self._conn.execute("ALTER TABLE edges ADD COLUMN hop TEXT NOT NULL DEFAULT 'seed'")
+        types = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(edges)")}
+        if types["rating_buyer"] != "INTEGER":
+            self._migrate_ratings()
+        self._conn.commit()
+
+    def _migrate_ratings(self) -> None:
+        # Stato creato quando i rating erano TEXT: il tipo di una colonna non si può
+        # cambiare, quindi la tabella viene ricostruita con gli stessi rowid (le
+        # posizioni delle esportazioni incrementali restano valide)
+        self._conn.commit()
+        self._conn.create_function("to_int", 1, _to_int, deterministic=True)
+        self._conn.executescript(
+            "BEGIN;"
+            "ALTER TABLE edges RENAME TO edges_text;"
+            "DROP INDEX edges_key;"
+            "DROP INDEX edges_seller;"
+            + SCHEMA
+            + """
+            INSERT INTO edges (rowid, buyer_id, seller_id, item_id, rating_buyer, rating_seller,
+                               item_title, fetched_at, hop)
+            SELECT rowid, buyer_id, seller_id, item_id, to_int(rating_buyer), to_int(rating_seller),
+                   item_title, fetched_at, hop
+            FROM edges_text;
+            DROP TABLE edges_text;
+            COMMIT;
+            """
+        )
+
+    # ------------------------------------------------------------------
+    # Frontiera
+    # ------------------------------------------------------------------
+
+    def add_users(self, user_ids: Iterable[int], phase: str, seed: bool = False) -> int:
+        """
+        Aggiunge gli utenti (se nuovi) e li mette in coda per la fase indicata.
+        Restituisce quanti utenti erano nuovi.
+        """
+        with self._lock, self._conn:
+            return self._add_users(user_ids, phase, seed)
+
+    def _add_users(self, user_ids: Iterable[int], phase: Optional[str], seed: bool = False) -> int:
+        now = time.time()
+        rows = [(uid,) for uid in {_to_int(u) for u in user_ids} if uid is not None]
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO users (user_id, is_seed, discovered_at) VALUES (?, ?, ?)",
+            [(uid, int(seed), now) for (uid,) in rows],
+        )
+        added = self._conn.total_changes - before
+        if seed:
+            self._conn.executemany("UPDATE users SET is_seed = 1 WHERE user_id = ?", rows)
+        if phase is None:
+            return added
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO tasks (user_id, phase, updated_at) VALUES (?, ?, ?)",
+            [(uid, phase, now) for (uid,) in rows],
+        )
+        return added
+
+    def pending(self, phase: str) -> List[int]:
+        """
+        Utenti ancora da elaborare nella fase: mai iniziati, interrotti a metà
+        (in_progress) o falliti con tentativi residui.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT user_id FROM tasks
+                WHERE phase = ? AND (status IN ('pending', 'in_progress')
+                                     OR (status = 'failed' AND attempts < ?))
+                ORDER BY rowid
+                """,
+                (phase, self.max_attempts),
+            ).fetchall()
+        return [uid for (uid,) in rows]
+
+    def retry(self, phase: str, user_ids: Iterable[int] = None) -> int:
+        """
+        Rimette in coda utenti già completati o falliti (tutti quelli della fase se
+        user_ids è None), azzerando tentativi e pagine.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if user_ids is None:
+                cursor = self._conn.execute(
+                    "UPDATE tasks SET status = 'pending', attempts = 0, last_page = 0, updated_at = ? WHERE phase = ?",
+                    (now, phase),
+                )
+                return cursor.rowcount
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "UPDATE tasks SET status = 'pending', attempts = 0, last_page = 0, updated_at = ? WHERE phase = ? AND user_id = ?",
+                [(now, phase, uid) for uid in user_ids],
+            )
+            return self._conn.total_changes - before
+
+    # ------------------------------------------------------------------
+    # Avanzamento
+    # ------------------------------------------------------------------
+
+    def start(self, user_id: int, phase: str) -> int:
+        """
+        Segna l'utente come in elaborazione e restituisce l'ultima pagina già salvata
+        (0 se nessuna): il download riprende dalla pagina successiva.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO tasks (user_id, phase, updated_at) VALUES (?, ?, ?)",
+                (user_id, phase, time.time()),
+            )
+            self._conn.execute(
+                "UPDATE tasks SET status = 'in_progress', attempts = attempts + 1, updated_at = ? WHERE user_id = ? AND phase = ?",
+                (time.time(), user_id, phase),
+            )
+            (last_page,) = self._conn.execute(
+                "SELECT last_page FROM tasks WHERE user_id = ? AND phase = ?", (user_id, phase)
+            ).fetchone()
+        return last_page
+
+    def record_page(
+        self,
+        user_id: int,
+        phase: str,
+        page: int,
+        rows: List[Dict[str, Any]],
+        discovered_phase: str = "tag",
+    ) -> None:
+        """
+        Salva in un'unica transazione gli archi di una pagina, i nuovi utenti scoperti
+        (in coda per discovered_phase) e il numero della pagina.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._insert_edges(rows, now, hop=phase)
+            self._add_users(
+                [r.get("Acquirente_ID") for r in rows] + [r.get("Venditore_ID") for r in rows],
+                discovered_phase,
+            )
+            self._conn.execute(
+                "UPDATE tasks SET last_page = ?, updated_at = ? WHERE user_id = ? AND phase = ?",
+                (page, now, user_id, phase),
+            )
+
+    def record_edges(
+        self, rows: List[Dict[str, Any]], hop: str = "tag", discovered_phase: str = None
+    ) -> int:
+        """
+        Salva gli archi trovati fuori dalla fase seed (es. nelle pagine scaricate per il
+        tagging) con la loro provenienza `hop`. Non sovrascrivono archi già noti. Gli
+        utenti nuovi vengono registrati e messi in coda solo se discovered_phase è
+        indicata. Restituisce quanti archi erano nuovi.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._insert_edges(rows, now, hop=hop, replace=False)
+            added = self._conn.total_changes - before
+            self._add_users(
+                [r.get("Acquirente_ID") for r in rows] + [r.get("Venditore_ID") for r in rows],
+                discovered_phase,
+            )
+        return added
+
+    def finish(
+        self,
+        user_id: int,
+        phase: str,
+        main_tag: str = None,
+        detailed_tag: str = None,
+        error: str = None,
+    ) -> None:
+        """
+        Chiude l'elaborazione dell'utente: done, oppure failed se c'è un errore.
+        I tag, se presenti, vengono salvati nella stessa transazione. Chiudere una
+        fase mai aperta evita che l'utente venga messo in coda quando verrà scoperto.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if main_tag is not None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO users (user_id, discovered_at) VALUES (?, ?)", (user_id, now)
+                )
+                self._set_tags(user_id, main_tag, detailed_tag)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO tasks (user_id, phase, updated_at) VALUES (?, ?, ?)",
+                (user_id, phase, now),
+            )
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, updated_at = ? WHERE user_id = ? AND phase = ?",
+                ("failed" if error else "done", error, now, user_id, phase),
+            )
+
+    def _set_tags(self, user_id: int, main_tag: str, detailed_tag: str) -> None:
+        self._conn.execute(
+            "UPDATE users SET main_tag = ?, detailed_tag = ? WHERE user_id = ?",
+            (main_tag, detailed_tag, user_id),
+        )
+        # Registro delle modifiche: le esportazioni incrementali partono da qui
+        self._conn.execute(
+            "INSERT INTO tag_log (user_id, main_tag, detailed_tag) VALUES (?, ?, ?)",
+            (user_id, main_tag, detailed_tag),
+        )
+
+    def _insert_edges(
+        self, rows: List[Dict[str, Any]], now: float, hop: str = None, replace: bool = True
+    ) -> None:
+        # OR REPLACE: a parità di (acquirente, venditore, oggetto) vince l'ultima riga,
+        # come il drop_duplicates(keep='last') dei CSV. OR IGNORE per gli archi di
+        # contorno, che non devono cambiare la provenienza di un arco già noto.
+        self._conn.executemany(
+            f"""
+            INSERT OR {"REPLACE" if replace else "IGNORE"} INTO edges
+                (buyer_id, seller_id, item_id, rating_buyer, rating_seller, item_title, fetched_at, hop)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    _to_int(r.get("Acquirente_ID")),
+                    _to_int(r.get("Venditore_ID")),
+                    _to_int(r.get("Item_ID")),
+                    _to_int(r.get("Rating_Acquirente_V")),
+                    _to_int(r.get("Rating_Venditore_A")),
+                    r.get("Item_Title"),
+                    now,
+                    hop or r.get("Origine_Arco") or "seed",
+                )
+                for r in rows
+            ],
+        )
+
+    # ------------------------------------------------------------------
+    # Letture
+    # ------------------------------------------------------------------
+
+    def status(self, user_id: int, phase: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM tasks WHERE user_id = ? AND phase = ?", (user_id, phase)
+            ).fetchone()
+        return row[0] if row else None
+
+    def tags(self) -> Tuple[Dict[int, str], Dict[int, str]]:
+        """
+        Restituisce (main_tags, detailed_tags) degli utenti taggati.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, main_tag, detailed_tag FROM users WHERE main_tag IS NOT NULL"
+            ).fetchall()
+        return {u: m for u, m, _ in rows}, {u: d for u, _, d in rows}
+
+    def item_titles(self, seller_id: int) -> List[str]:
+        """
+        Titoli degli oggetti dei feedback già salvati per l'utente (per il tagging).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_title FROM edges WHERE seller_id = ? ORDER BY rowid", (seller_id,)
+            ).fetchall()
+        return [title or "" for (title,) in rows]
+
+    def iter_edges(
+        self, after: int = 0, until: int = None, batch_size: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Archi salvati, nel formato delle righe di vinted_raw_transactions.csv
+        (letti a blocchi, senza caricare tutta la tabella). after/until limitano la
+        lettura agli archi con rowid in (after, until]: un arco aggiornato riceve un
+        nuovo rowid, quindi sono gli archi cambiati dopo `after`.
+        """
+        last_rowid = after
+        until = self.last_edge_rowid() if until is None else until
+        while last_rowid < until:
+            with self._lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT rowid, buyer_id, seller_id, rating_buyer, rating_seller, item_id, hop
+                    FROM edges WHERE rowid > ? AND rowid <= ? ORDER BY rowid LIMIT ?
+                    """,
+                    (last_rowid, until, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for _, buyer_id, seller_id, rating_buyer, rating_seller, item_id, hop in rows:
+                yield {
+                    "Acquirente_ID": buyer_id,
+                    "Venditore_ID": seller_id,
+                    "Rating_Acquirente_V": rating_buyer,
+                    "Rating_Venditore_A": rating_seller,
+                    "Item_ID": item_id,
+                    "Origine_Arco": hop,
+                }
+            last_rowid = rows[-1][0]
+
+    def last_edge_rowid(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT IFNULL(MAX(rowid), 0) FROM edges").fetchone()[0]
+
+    def tags_since(self, seq: int, until: int = None) -> Tuple[List[Tuple[int, str, str]], int]:
+        """
+        Tag assegnati dopo la posizione `seq` del registro (fino a `until` compreso),
+        con la nuova posizione.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, user_id, main_tag, detailed_tag FROM tag_log WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (seq, until if until is not None else 2**62),
+            ).fetchall()
+        if not rows:
+            return [], seq
+        return [(u, m, d) for _, u, m, d in rows], rows[-1][0]
+
+    def last_tag_seq(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT IFNULL(MAX(seq), 0) FROM tag_log").fetchone()[0]
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key: str, value: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            users = self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            edges = self._conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+            tag_edges = self._conn.execute("SELECT COUNT(*) FROM edges WHERE hop = 'tag'").fetchone()[0]
+            tagged = self._conn.execute(
+                "SELECT COUNT(*) FROM users WHERE main_tag IS NOT NULL"
+            ).fetchone()[0]
+        return {"users": users, "edges": edges, "tag_edges": tag_edges, "tagged": tagged}
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+    # ------------------------------------------------------------------
+    # Migrazione dai CSV
+    # ------------------------------------------------------------------
+
+    def import_csv(self, transactions_path: str, tags_path: str = None) -> None:
+        """
+        Importa una volta sola i CSV di un crawling precedente: archi, utenti (in coda
+        per il tagging) e tag. Gli utenti già taggati risultano completati.
+        """
+        now = time.time()
+        if os.path.exists(transactions_path):
+            df = pd.read_csv(transactions_path)
+            rows = df.astype(object).where(df.notna(), None).to_dict("records")
+            with self._lock, self._conn:
+                self._insert_edges(rows, now)
+                self._add_users(
+                    [r.get("Acquirente_ID") for r in rows] + [r.get("Venditore_ID") for r in rows],
+                    "tag",
+                )
+            print(f"Importate {len(rows)} transazioni da {transactions_path}")
+
+        if tags_path and os.path.exists(tags_path):
+            df_tags = pd.read_csv(tags_path)
+            with self._lock, self._conn:
+                for node_id, main_tag, detailed_tag in zip(
+                    df_tags["Node_ID"], df_tags["Main_Tag"], df_tags.get("Detailed_Tag", df_tags["Main_Tag"])
+                ):
+                    user_id = _to_int(node_id)
+                    if user_id is None or pd.isna(main_tag):
+                        continue
+                    self._add_users([user_id], "tag")
+                    self._set_tags(user_id, main_tag, None if pd.isna(detailed_tag) else detailed_tag)
+                    # 'Inattivo' resta fallito: verrà ritentato come prima
+                    self._conn.execute(
+                        "UPDATE tasks SET status = ?, updated_at = ? WHERE user_id = ? AND phase = 'tag'",
+                        ("failed" if main_tag == "Inattivo" else "done", now, user_id),
+                    )
+            print(f"Importati {len(df_tags)} tag da {tags_path}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
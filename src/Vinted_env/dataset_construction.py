@@ -1,6 +1,8 @@
-import pandas as pd
 import numpy as np # Ci servirà per la logica dei SEED
 
+from dataset_io import write_table
+from transaction_log import read_tags, read_transactions
+
 # =========================================================
 # CONFIG
 # =========================================================
@@ -29,8 +31,9 @@ SEED_USER_IDS: set[int] = {
 # =========================================================
 print("Caricamento file...")
 try:
-    df_tx = pd.read_csv(TRANSACTIONS_FILE)
-    df_tags = pd.read_csv(TAGS_FILE)
+    # I CSV sono log in cui si aggiunge in coda: vale l'ultima riga per chiave
+    df_tx = read_transactions(TRANSACTIONS_FILE)
+    df_tags = read_tags(TAGS_FILE)
 except Exception as e:
     print(f"Errore caricamento file: {e}")
     exit()
@@ -41,16 +44,10 @@ print(f"File caricati. Transazioni totali (grezze): {len(df_tx)} | Tag utenti to
 # NORMALIZZAZIONE E PULIZIA ID 
 # =========================================================
 print("Normalizzazione ID...")
-for col in ["Acquirente_ID", "Venditore_ID"]:
-    df_tx[col] = pd.to_numeric(df_tx[col], errors="coerce")
-df_tags["Node_ID"] = pd.to_numeric(df_tags["Node_ID"], errors="coerce")
-
-
+# Gli ID arrivano già come interi nullable (Int64): gli ID non validi sono nulli
 df_tx = df_tx.dropna(subset=["Acquirente_ID", "Venditore_ID"])
 df_tags = df_tags.dropna(subset=["Node_ID"])
 
-df_tags["Node_ID"] = df_tags["Node_ID"].astype(int)
-
 # =========================================================
 # FILTRAGGIO NODI 
 # =========================================================
@@ -101,6 +98,9 @@ filtro_venditore = df_tx["Venditore_ID"].isin(nodi_da_tenere_set)
 df_tx_filtrate = df_tx[filtro_acquirente & filtro_venditore].copy() 
 
 print(f"Transazioni filtrate: {len(df_tx_filtrate)} (da {len(df_tx)} iniziali)")
+if "Origine_Arco" in df_tx_filtrate.columns:
+    # 'seed': pagine dei seed, 'tag': pagine scaricate durante il tagging
+    print(f"Per provenienza: {df_tx_filtrate['Origine_Arco'].value_counts().to_dict()}")
 
 # =========================================================
 # MERGE TAG UTENTI 
@@ -130,9 +130,6 @@ df_merged = (
 # METRICHE BASE 
 # =========================================================
 print("Calcolo metriche base...")
-df_merged["Rating_Acquirente_V"] = pd.to_numeric(df_merged["Rating_Acquirente_V"], errors="coerce")
-df_merged["Rating_Venditore_A"] = pd.to_numeric(df_merged["Rating_Venditore_A"], errors="coerce")
-
 df_merged["Rating_Medio"] = df_merged[["Rating_Acquirente_V", "Rating_Venditore_A"]].mean(axis=1)
 
 # Conteggio delle transazioni per coppia 
@@ -146,7 +143,7 @@ df_merged = df_merged.merge(df_counts, on=["Acquirente_ID", "Venditore_ID"], how
 # =========================================================
 # SALVATAGGIO DATASET 
 # =========================================================
-df_merged.to_csv(OUTPUT_DATASET, index=False, encoding="utf-8")
+df_merged = write_table(df_merged, OUTPUT_DATASET)
 print("\n" + "="*50)
 print(f"Fatto! Dataset PULITO salvato in: {OUTPUT_DATASET}")
 print(f"Righe finali (transazioni nel grafo): {len(df_merged)}")
@@ -0,0 +1,115 @@
+import os
+
+import pandas as pd
+
+from vinted.utils import atomic_write
+
+try:
+    import pyarrow  # noqa: F401  (motore di pandas per i file Parquet)
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# ========================================================================
+# TABELLE TIPIZZATE (Parquet) CON ESPORTAZIONE CSV
+# ========================================================================
+#
+# Ogni tabella della pipeline (transazioni grezze, tag, dataset pulito e finale) è
+# salvata in Parquet accanto al CSV con lo stesso nome: ID interi nullable (mai più
+# 108622456.0), rating su int8, tag e provenienza degli archi come categorie (un
+# dizionario per colonna invece di una stringa ripetuta per riga). Il CSV resta come esportazione per chi lo apre a
+# mano; chi legge usa il Parquet se è aggiornato rispetto al CSV.
+#
+# Senza pyarrow si lavora solo con i CSV, comunque tipizzati dopo la lettura.
+
+ID_COLUMNS = ["Acquirente_ID", "Venditore_ID", "Item_ID", "Node_ID"]
+RATING_COLUMNS = ["Rating_Acquirente_V", "Rating_Venditore_A"]
+CATEGORY_COLUMNS = [
+    "Acquirente_Community",
+    "Venditore_Community",
+    "Main_Tag",
+    "Detailed_Tag",
+    "Main_Tag_Acquirente",
+    "Detailed_Tag_Acquirente",
+    "Main_Tag_Venditore",
+    "Detailed_Tag_Venditore",
+    "Origine_Arco",
+]
+
+SCHEMA = {
+    **{col: "Int64" for col in ID_COLUMNS},
+    **{col: "Int8" for col in RATING_COLUMNS},
+    **{col: "category" for col in CATEGORY_COLUMNS},
+    "Numero_Transazioni": "Int32",
+    "Rating_Medio": "float32",
+}
+
+_parquet_warning_shown = False
+
+
+def parquet_path(csv_path: str) -> str:
+    """
+    File Parquet associato a un CSV della pipeline (stesso nome, estensione .parquet).
+    """
+    root, _ = os.path.splitext(csv_path)
+    return root + ".parquet"
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte le colonne note della pipeline ai tipi di SCHEMA. I valori non numerici
+    di ID e rating diventano nulli, come con pd.to_numeric(errors="coerce").
+    """
+    df = df.copy()
+    for col, dtype in SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if dtype.startswith("Int"):
+            values = values.round()
+        df[col] = values.astype(dtype)
+    return df
+
+
+def read_table(csv_path: str) -> pd.DataFrame:
+    """
+    Legge una tabella della pipeline: dal Parquet se esiste e non è più vecchio del
+    CSV (che può essere stato aggiornato da uno script senza pyarrow o da un log in
+    coda), altrimenti dal CSV.
+    """
+    path = parquet_path(csv_path)
+    if (
+        HAS_PARQUET
+        and os.path.exists(path)
+        and (not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path))
+    ):
+        return typed(pd.read_parquet(path))
+    # Le categorie già in lettura: le stringhe ripetute non vengono mai materializzate
+    df = pd.read_csv(csv_path, dtype={col: "category" for col in CATEGORY_COLUMNS})
+    return typed(df)
+
+
+def write_table(df: pd.DataFrame, csv_path: str, export_csv: bool = True) -> pd.DataFrame:
+    """
+    Salva una tabella tipizzata in Parquet e, con `export_csv`, anche nel CSV. Le
+    scritture passano da un file temporaneo, quindi un'interruzione non lascia file
+    a metà. Restituisce il DataFrame tipizzato.
+    """
+    global _parquet_warning_shown
+    df = typed(df)
+
+    # Prima il CSV, poi il Parquet: read_table sceglie il Parquet solo se è il più recente
+    if export_csv or not HAS_PARQUET:
+        with atomic_write(csv_path, newline="") as f:
+            df.to_csv(f, index=False)
+
+    if HAS_PARQUET:
+        with atomic_write(parquet_path(csv_path), "wb") as f:
+            df.to_parquet(f, index=False)
+    elif not _parquet_warning_shown:
+        print("AVVISO: pyarrow non installato, salvo solo i CSV (pip install pyarrow).")
+        _parquet_warning_shown = True
+    return df
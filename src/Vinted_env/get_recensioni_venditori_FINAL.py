@@ -1,117 +1,127 @@
-import time
-import json
-import re
-import random
 import os
-from typing import Dict, Any, List, Set, Tuple
-import sys
+from typing import Dict, Any, List, Tuple
 import pandas as pd
-import numpy as np
 from vinted import Vinted
+from vinted.batch import run_batch
+
+from crawl_config import (
+    COOKIES_PATH,
+    LOG_SAMPLE,
+    create_cassette,
+    create_feedback_store,
+    create_metrics,
+    create_rate_limiter,
+    create_session,
+    export_metrics,
+    setup_logging,
+)
+from dataset_io import read_table, write_table
 
 # ========================================================================
 # CONFIGURAZIONE
 # ========================================================================
 
+# Sessione, cassette, metriche, log e pagine di feedback condivise: vedi crawl_config.py
 
-RAW_COOKIE_STRING = "Z3NPQ3RhVWlQR250UHdkblUrbGxGWk42QzdvMHc1WFBERkhFbTFNeDdFZGNncVBOYS9zMHRXUWFHd0FYeDZtS3BRaUJoK0h3c0NNVW96VEsrN0FjbUQ5S01DSThDSmJzTzNDUmpuTkovSmdpSXpPdWNCNVJwSXpVYWE2S0FHY2JUQ296Zzh5RExDK2dhRkFzTkRzZG5MYmFwTjRTeHpYYU82WFNVeWVGL0hDVm5SZGVBQTJveTJQVmdkTDhKZFRycEZaZm0vS3BnNmRzY3pyTXdSQzVxaUkrTm1xMzZFUHpTNnBBTUxsTkJLWldKMG02MEo3TnZGN2JubHYxZHJNZC0tU29ndmxIaXNsOVFnbWxLWkp3WGlLdz09--524cb072dbb53d99ba5df62d1da8d6d5b3616a20; banners_ui_state=SUCCESS; _ga_KVH0QH2Q98=GS2.1.s1762257510$o3$g1$t1762257544$j26$l0$h0; _ga_ZJHK1N3D75=GS2.1.s1762257510$o3$g1$t1762257544$j26$l0$h0;"
-
+# Unici campi dei feedback che servono per trovare la contro-recensione
+COUNTER_REVIEW_FIELDS = ["feedback_user_id", "rating", "item_id"]
 
 INPUT_DATASET = "vinted_dataset_PULITO.csv"
 OUTPUT_DATASET = "vinted_dataset_FINAL.csv"
 
-MIN_SLEEP = 3
-MAX_SLEEP = 6
-SAVE_EVERY = 10 
-HAS_RESTARTED = False 
-
-# ========================================================================
-# UTILITY 
-# ========================================================================
-
-def convert_cookie_string_to_dict(cookie_string: str) -> Dict[str, str]:
-    cookies_dict: Dict[str, str] = {}
-    if not cookie_string:
-        return cookies_dict
-    cookie_string = cookie_string.strip().rstrip(';')
-    pairs = cookie_string.split(';')
-    for pair in pairs:
-        pair = pair.strip()
-        if not pair:
-            continue
-        if '=' in pair:
-            key, value = pair.split('=', 1)
-            cookies_dict[key.strip()] = value.strip()
-    return cookies_dict
+# Rate limiter adattivo (richieste/secondo), partenza e tetto di questo script
+RATE_INITIAL = 1 / 4
+RATE_MAX = 2.0
+RATE_INCREASE = 0.02
+SAVE_EVERY = 10 # Acquirenti risolti tra un salvataggio e l'altro
+COUNTER_REVIEW_WORKERS = 4 # Acquirenti elaborati in parallelo (il ritmo resta quello del rate limiter)
 
 # ========================================================================
 # FUNZIONE PER COUNTER REVIEW
 # ========================================================================
 
-def find_counter_review(vinted_client: Vinted, buyer_id: int, seller_id: int) -> int | None:
-    
-    page = 1
-    
-    while True:
-        try: 
-            url_feedback = f"{vinted_client.api_url}/user_feedbacks?user_id={buyer_id}&page={page}&per_page=20&by=all"
-            
-            response = vinted_client.scraper.get(url_feedback,
-                                          headers=getattr(vinted_client, "headers", {}),
-                                          cookies=getattr(vinted_client, "cookies", {}),
-                                          proxies=getattr(vinted_client, "proxy", None))
-            response.raise_for_status() # Errore 503
-            raw_json_data = response.json()
-
-            if 'user_feedbacks' not in raw_json_data or not raw_json_data['user_feedbacks']:
-                return None 
-
-            for feedback in raw_json_data['user_feedbacks']:
+def resolve_counter_reviews(vinted_client: Vinted, buyer_id: int,
+                            rows: List[Tuple[int, int | None]]) -> List[int]:
+    """
+    Trova le contro-recensioni lasciate all'acquirente per tutte le sue righe
+    (venditore, oggetto) scorrendo i suoi feedback UNA volta sola, invece di
+    ricominciare dalla pagina 1 per ogni riga.
+
+    I feedback letti finiscono in un indice (autore, oggetto) -> rating e
+    autore -> rating (vince il più recente). Una riga è risolta quando c'è il
+    feedback del venditore per quel suo oggetto (o uno qualsiasi del venditore se
+    l'oggetto non è noto); la paginazione si ferma appena tutte le righe sono
+    risolte. Le righe rimaste senza feedback per l'oggetto prendono quello più
+    recente del venditore. Restituisce il rating per ogni riga, 0 se la
+    contro-recensione non esiste.
+    """
+    by_item: Dict[Tuple[int, int], int] = {}
+    by_author: Dict[int, int] = {}
+
+    def all_resolved() -> bool:
+        return all(
+            seller_id in by_author if item_id is None else (seller_id, item_id) in by_item
+            for seller_id, item_id in rows
+        )
+
+    # Prima le pagine già scaricate (anche vecchie): una recensione trovata resta valida
+    store = vinted_client.feedback_store
+    if store is not None:
+        for seller_id, item_id in set(rows):
+            stored = store.find(buyer_id, seller_id, item_id)
+            if stored is not None:
+                by_item.setdefault((seller_id, stored.item_id), stored.rating)
+                by_author.setdefault(seller_id, stored.rating)
+
+    if not all_resolved():
+        # Poi le pagine del compratore: quelle recenti arrivano dal file condiviso, le
+        # altre dalla rete (e vengono salvate).
+        # Senza prefetch: di solito le contro-recensioni si trovano nelle prime pagine e
+        # scaricare in anticipo la pagina successiva sprecherebbe una richiesta
+        feedbacks = vinted_client.iter_user_feedbacks(buyer_id, prefetch=False, projection=COUNTER_REVIEW_FIELDS)
+        try:
+            for feedback in feedbacks:
                 # 'feedback_user_id' è la persona CHE HA LASCIATO il feedback
-                feedback_author_id = feedback.get('feedback_user_id')
-                
-                if feedback_author_id == seller_id:
-                    return feedback.get('rating')
-
-            
-            pagination = raw_json_data.get('pagination')
-            if not pagination or pagination.get('current_page', page) >= pagination.get('total_pages', page):
-                return None
-            
-            page += 1
-            
-            time.sleep(random.randint(2, 5))
-
-        except Exception as e:
-           
-            raise e
-    
-    return None 
+                author_id = feedback.feedback_user_id
+                by_item.setdefault((author_id, feedback.item_id), feedback.rating)
+                by_author.setdefault(author_id, feedback.rating)
+                if all_resolved():
+                    break
+        finally:
+            feedbacks.close()
+
+    return [
+        by_item.get((seller_id, item_id), by_author.get(seller_id)) or 0
+        for seller_id, item_id in rows
+    ]
+
+def find_counter_review(vinted_client: Vinted, buyer_id: int, seller_id: int) -> int | None:
+    """
+    Contro-recensione di una singola coppia (per più righe usare resolve_counter_reviews).
+    """
+    rating = resolve_counter_reviews(vinted_client, buyer_id, [(seller_id, None)])[0]
+    return rating or None
 
 # ========================================================================
 # NUOVO SCRAPER
 # ========================================================================
 
 def main():
-    global HAS_RESTARTED
-    
-   
-    CUSTOM_COOKIES_DICT = convert_cookie_string_to_dict(RAW_COOKIE_STRING)
-    vinted = Vinted(domain="it")
-    try:
-        vinted.update_cookies(CUSTOM_COOKIES_DICT)
-    except Exception:
-        vinted.cookies = CUSTOM_COOKIES_DICT
-    print("Autenticazione impostata.")
+    vinted = Vinted(domain="it", rate_limiter=create_rate_limiter(RATE_INITIAL, RATE_MAX, RATE_INCREASE), cassette=create_cassette(),
+                    session=create_session(), metrics=create_metrics(),
+                    feedback_store=create_feedback_store())
+    vinted.set_log_sampling(LOG_SAMPLE)
+    print(f"Cookie di sessione: {COOKIES_PATH}")
 
     
     if os.path.exists(OUTPUT_DATASET):
         print(f"File di output trovato. Carico '{OUTPUT_DATASET}' per riprendere...")
-        df = pd.read_csv(OUTPUT_DATASET)
+        df = read_table(OUTPUT_DATASET)
     else:
         print(f"Carico input file: '{INPUT_DATASET}'...")
-        df = pd.read_csv(INPUT_DATASET)
-        df['Rating_Venditore_A'] = np.nan 
+        df = read_table(INPUT_DATASET)
+        df['Rating_Venditore_A'] = pd.NA
+        df['Rating_Venditore_A'] = df['Rating_Venditore_A'].astype("Int8")
         
     print(f"Dataset caricato. Totale transazioni: {len(df)}")
 
@@ -122,79 +132,86 @@ def main():
     processed_count = df['Rating_Venditore_A'].notna().sum()
     total_count = len(df)
     print(f"Progresso: {processed_count} / {total_count} già processati.")
-    
-    try:
-        for index, row in df.iterrows():
-            
-            #  Logica di Resume 
-            # Se il rating NON è NaN, significa che l'abbiamo già processato (o trovato 1-5, o messo 0)
-            if pd.notna(row['Rating_Venditore_A']):
-                continue 
-
-            
-            try:
-                buyer_id = int(row['Acquirente_ID'])
-                seller_id = int(row['Venditore_ID'])
-            except Exception:
-                print(f"Riga {index} saltata (ID non validi).")
-                continue 
-
-            print(f"\nProcesso riga {index+1}/{total_count} (Acquirente: {buyer_id}, Venditore: {seller_id})...")
-
-            try:
-                #  Chiamata API 
-                rating = find_counter_review(vinted, buyer_id, seller_id)
-                
 
-                if rating:
-                    print(f"  -> TROVATO! Rating: {rating}")
-                    df.at[index, 'Rating_Venditore_A'] = rating
-                else:
-                    print(f"  ->  Non trovato.")
-                    df.at[index, 'Rating_Venditore_A'] = 0 
-                
-                sleep_duration = random.randint(MIN_SLEEP, MAX_SLEEP)
-                print(f"  -> Pausa di {sleep_duration}s...")
-                time.sleep(sleep_duration)
+    #  Logica di Resume 
+    # Se il rating NON è NaN, la riga è già processata (trovato 1-5, o messo 0).
+    # Le righe da fare vengono raggruppate per acquirente: i feedback di ogni
+    # acquirente si scorrono una volta sola per tutte le sue righe.
+    pending = df[df['Rating_Venditore_A'].isna()].dropna(subset=['Acquirente_ID', 'Venditore_ID'])
+    skipped = df['Rating_Venditore_A'].isna().sum() - len(pending)
+    if skipped:
+        print(f"{skipped} righe saltate (ID non validi).")
+    buyer_rows = {
+        int(buyer_id): group
+        for buyer_id, group in pending.groupby('Acquirente_ID', sort=False)
+    }
+    print(f"Righe da processare: {len(pending)} su {len(buyer_rows)} acquirenti.")
+
+    # Risultati in attesa di essere scritti nel DataFrame (in blocco, a ogni salvataggio)
+    found_index: List[Any] = []
+    found_ratings: List[int] = []
+
+    def flush_results():
+        if found_index:
+            df.loc[found_index, 'Rating_Venditore_A'] = found_ratings
+            found_index.clear()
+            found_ratings.clear()
+
+    def resolve(buyer_id: int) -> List[int]:
+        group = buyer_rows[buyer_id]
+        items = group['Item_ID'] if 'Item_ID' in group.columns else pd.Series(pd.NA, index=group.index)
+        rows = [
+            (int(seller_id), None if pd.isna(item_id) else int(item_id))
+            for seller_id, item_id in zip(group['Venditore_ID'], items)
+        ]
+        return resolve_counter_reviews(vinted, buyer_id, rows)
+
+    vinted.resize_connection_pool(COUNTER_REVIEW_WORKERS)
+    results = run_batch(resolve, list(buyer_rows), max_workers=COUNTER_REVIEW_WORKERS)
+
+    try:
+        for i, result in enumerate(results):
+            buyer_id = result.key
+            group = buyer_rows[buyer_id]
+
+            if result.ok:
+                ratings = result.value
+                found_index.extend(group.index)
+                found_ratings.extend(ratings)
+                found = sum(1 for rating in ratings if rating)
+                print(f"Acquirente {i+1}/{len(buyer_rows)} ({buyer_id}): "
+                      f"{found}/{len(group)} contro-recensioni trovate.")
 
             # GESTIONE ERRORI  
-            except Exception as e:
-                err_str = str(e)
-                print(f"Errore during scraping della riga {index}: {err_str}")
+            else:
+                err_str = str(result.error)
+                print(f"Errore durante lo scraping dell'acquirente {buyer_id}: {err_str}")
 
                 is_401_error = "401" in err_str or "Unauthorized" in err_str
                 is_connection_error = "Connection aborted" in err_str or "RemoteDisconnected" in err_str
                 is_server_error = "500" in err_str or "503" in err_str 
                 
-                if (is_401_error or is_connection_error or is_server_error) and not HAS_RESTARTED:
-                    print(f"🚨 Errore Riavviabile Rilevato: ({err_str[:50]}...)")
-                    print("🔁 Riavvio automatico del programma tra 10 secondi...")
-                
-
-                    HAS_RESTARTED = True
-                    df.to_csv(OUTPUT_DATASET, index=False, encoding='utf-8')
-                    print("Salvataggio progressi completato.")
-                    time.sleep(10)
-                    
-                    os.execv(sys.executable, [sys.executable] + sys.argv)
+                # Il client rinnova già la sessione sui 401 e run_batch ritenta gli errori
+                # temporanei: se arrivano fin qui riavviare il processo non servirebbe.
+                # Le righe dell'acquirente restano da fare e vengono riprese al prossimo avvio
+                if is_401_error or is_connection_error or is_server_error:
+                    if is_401_error:
+                        print("Errore 401: sessione non rinnovabile, controlla i cookie.")
+                    print(f"Acquirente {buyer_id} saltato, verrà ritentato al prossimo avvio.")
 
                 else:
                     
-                    print("ERRORE NON GESTIBILE (403, 429, o errore ripetuto).")
-                    
-                   
-                    if not (is_401_error or is_connection_error or is_server_error):
-                         print("Questo è probabilmente un BAN IP. Riprova tra 24 ore.")
-                    else:
-                         print("L'errore riavviabile persiste dopo il riavvio. Fermo lo script.")
-                    
-                    raise e 
+                    print("ERRORE NON GESTIBILE (403, 429).")
+                    print("Questo è probabilmente un BAN IP. Riprova tra 24 ore.")
+                    raise result.error 
 
             # Salvataggio Incrementale 
-            if (index + 1) % SAVE_EVERY == 0:
-                print(f"\n SALVATAGGIO INCREMENTALE (riga {index+1}) ")
-                df.to_csv(OUTPUT_DATASET, index=False, encoding='utf-8')
-                print(" Salvataggio completato. ")
+            if (i + 1) % SAVE_EVERY == 0:
+                print(f"\n SALVATAGGIO INCREMENTALE (acquirente {i+1}) ")
+                flush_results()
+                write_table(df, OUTPUT_DATASET)
+                print(f" Salvataggio completato. Rate attuale: {vinted.rate_limiter.rate:.3f} req/s")
+                export_metrics(vinted)
 
     except KeyboardInterrupt:
         print("\nInterruzione manuale rilevata (Ctrl+C). Salvataggio...")
@@ -205,11 +222,15 @@ def main():
     finally:
         # BLOCCO SALVATAGGIO (FINALE)
         print("\n SALVATAGGIO FINALE ")
-        df.to_csv(OUTPUT_DATASET, index=False, encoding='utf-8')
+        results.close()
+        flush_results()
+        write_table(df, OUTPUT_DATASET)
+        export_metrics(vinted)
         print(f" Dati salvati in: {OUTPUT_DATASET}")
 
 # ========================================================================
 # ESECUZIONE
 # ========================================================================
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
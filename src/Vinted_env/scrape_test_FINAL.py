@@ -1,34 +1,46 @@
-import time
 import json
 import re
-import random
 import os
-from typing import Dict, Any, List, Set, Tuple
-import sys
-
-HAS_RESTARTED = False  # flag per evitare restart infiniti
+from typing import Dict, Any, List, Tuple
 
 # API Vinted 
 from vinted import Vinted
-
-# Import modelli 
-from vinted.models.users import UserFeedbacksResponse
-from vinted.models.items import UserItemsResponse, DetailedItem
-from vinted.models.search import SearchResponse
-
-import pandas as pd
+from vinted.pagination import paginate_pages
+from vinted.sweep import SweepStats
+
+from crawl_config import (
+    COOKIES_PATH,
+    LOG_SAMPLE,
+    create_cassette,
+    create_feedback_store,
+    create_metrics,
+    create_rate_limiter,
+    create_session,
+    export_metrics,
+    setup_logging,
+)
+from crawl_state import CrawlState
+from dataset_io import write_table
+from transaction_log import TransactionLog, read_tags, read_transactions
 
 # ========================================================================
 # CONFIGURAZIONE
 # ========================================================================
 
-#Cookie di sessione
-RAW_COOKIE_STRING = "Z3NPQ3RhVWlQR250UHdkblUrbGxGWk42QzdvMHc1WFBERkhFbTFNeDdFZGNncVBOYS9zMHRXUWFHd0FYeDZtS3BRaUJoK0h3c0NNVW96VEsrN0FjbUQ5S01DSThDSmJzTzNDUmpuTkovSmdpSXpPdWNCNVJwSXpVYWE2S0FHY2JUQ296Zzh5RExDK2dhRkFzTkRzZG5MYmFwTjRTeHpYYU82WFNVeWVGL0hDVm5SZGVBQTJveTJQVmdkTDhKZFRycEZaZm0vS3BnNmRzY3pyTXdSQzVxaUkrTm1xMzZFUHpTNnBBTUxsTkJLWldKMG02MEo3TnZGN2JubHYxZHJNZC0tU29ndmxIaXNsOVFnbWxLWkp3WGlLdz09--524cb072dbb53d99ba5df62d1da8d6d5b3616a20; banners_ui_state=SUCCESS; _ga_KVH0QH2Q98=GS2.1.s1762257510$o3$g1$t1762257544$j26$l0$h0; _ga_ZJHK1N3D75=GS2.1.s1762257510$o3$g1$t1762257544$j26$l0$h0;"
+# Sessione, cassette, metriche, log e pagine di feedback condivise: vedi crawl_config.py
+
+# Rate limiter adattivo (richieste/secondo), partenza e tetto di questo script
+RATE_INITIAL = 1 / 8
+RATE_MAX = 1.0
+RATE_INCREASE = 0.01
+
+# Utenti taggati in parallelo (il ritmo complessivo resta quello del rate limiter)
+TAG_WORKERS = 4
 
-SEED_MIN_SLEEP = 8
-SEED_MAX_SLEEP = 16
-TAG_MIN_SLEEP = 7
-TAG_MAX_SLEEP = 12
+# Le pagine di feedback scaricate per il tagging contengono anche archi: vengono
+# salvati con Origine_Arco='tag' (quelli dei seed hanno 'seed'). Con True anche gli
+# utenti nuovi trovati così vanno in coda per il tagging (crawling a più hop)
+TAG_HOP_DISCOVERY = False
 
 SEED_USER_IDS: List[int] = [263549027, 51137088,149109512, 142839912, 270173606,
                             79807304, 87684939, 86638253, 90996890, 76860837,
@@ -47,29 +59,15 @@ SEED_USER_IDS: List[int] = [263549027, 51137088,149109512, 142839912, 270173606,
                             185432581, 113844804, 242358895, 273563210, 49418268,
                             49757359, 73811740,292205078, 231528986, 128897593, 147025135, 55125380]
 
+# Unici campi dei feedback usati dal crawler (proiezione: niente oggetti ShortUser/UserPhoto)
+FEEDBACK_FIELDS = ["feedback_user_id", "user_id", "rating", "item_id", "item_title"]
+
 FILE_NAME = "vinted_raw_transactions.csv"
 TAGS_FILE_NAME = "vinted_user_tags.csv"
 
-# ========================================================================
-# UTILITY
-# ========================================================================
-
-def convert_cookie_string_to_dict(cookie_string: str) -> Dict[str, str]:
-
-    cookies_dict: Dict[str, str] = {}
-    if not cookie_string:
-        return cookies_dict
-    # rimuovi eventuale ; finale
-    cookie_string = cookie_string.strip().rstrip(';')
-    pairs = cookie_string.split(';')
-    for pair in pairs:
-        pair = pair.strip()
-        if not pair:
-            continue
-        if '=' in pair:
-            key, value = pair.split('=', 1)
-            cookies_dict[key.strip()] = value.strip()
-    return cookies_dict
+# Stato del crawling (frontiera, avanzamento per utente, archi e tag): i CSV qui sopra
+# vengono esportati da qui e letti solo al primo avvio, per importare i dati vecchi
+STATE_PATH = os.environ.get("VINTED_STATE", "vinted_crawl_state.sqlite")
 
 # ========================================================================
 # FUNZIONE DI TAGGING 
@@ -186,93 +184,142 @@ INTEREST_QUERIES = [
     "Gucci", "Prada", "Dior", "Fendi", "Chanel", "Thun", "Profumi", "Ikea", "Sport",
 ]
 
-def find_ids_from_raw_json(query_text: str) -> List[int]:
+def find_ids_from_raw_json(query_text: str, vinted: Vinted = None) -> List[int]:
  
-    CUSTOM_COOKIES_DICT = convert_cookie_string_to_dict(RAW_COOKIE_STRING)
-    vinted = Vinted(domain="it")
-    try:
-        vinted.update_cookies(CUSTOM_COOKIES_DICT)
-    except Exception:
-        try:
-            vinted.cookies = CUSTOM_COOKIES_DICT
-        except Exception:
-            pass
+    if vinted is None:
+        vinted = Vinted(domain="it", rate_limiter=create_rate_limiter(RATE_INITIAL, RATE_MAX, RATE_INCREASE), cassette=create_cassette(),
+                        session=create_session(), metrics=create_metrics())
 
-    url = f"https://www.vinted.it/api/v2/catalog/items?page=1&per_page=5&search_text={query_text.replace(' ', '+')}"
-    print(f"Cerco PRODOTTI (via URL grezzo) per query: '{query_text}'...")
+    print(f"Cerco PRODOTTI per query: '{query_text}'...")
 
     try:
-        response = vinted.scraper.get(url, headers=getattr(vinted, "headers", {}), cookies=getattr(vinted, "cookies", {}), proxies=getattr(vinted, "proxy", None))
-        response.raise_for_status()
-        raw_json_data = response.json()
+        results = vinted.search(query=query_text, per_page=5, order="relevance",
+                                projection=["user.id", "user.login"])
 
         real_seed_ids = []
-        if 'items' in raw_json_data and raw_json_data['items']:
-            print(f"Trovati {len(raw_json_data['items'])} prodotti. ID Venditori:")
-            for item in raw_json_data['items']:
-                user = item.get('user') or {}
-                vendor_id = user.get('id')
-                vendor_login = user.get('login', '<no-login>')
+        if results.records:
+            print(f"Trovati {len(results.records)} prodotti. ID Venditori:")
+            for item in results.records:
+                vendor_id = item.user_id
+                vendor_login = item.user_login or '<no-login>'
                 if vendor_id and vendor_id not in real_seed_ids:
                     print(f"  - Login: {vendor_login}, ID: {vendor_id}")
                     real_seed_ids.append(vendor_id)
             return real_seed_ids
         else:
-            print("Nessun prodotto trovato nel JSON grezzo.")
+            print("Nessun prodotto trovato.")
             return []
 
     except Exception as e:
-        print(f"ERRORE GRAVE nella ricerca grezza: {e}")
+        print(f"ERRORE GRAVE nella ricerca prodotti: {e}")
         return []
 
-# ========================================================================
-# SALVATAGGIO INCREMENTALE
-# ========================================================================
 
-def save_progress(feedback_list: List[Dict[str, Any]], main_tags_dict: Dict[int, str], detailed_tags_dict: Dict[int, str]):
+def find_seed_ids_by_sweep(query_text: str, vinted: Vinted, max_sellers: int = None) -> List[int]:
     """
-    Salva i dati raccolti (archi e proprietà dei nodi) in file CSV.
-    Protegge contro DataFrame vuoti, tipi non numerici, duplicati.
+    Come find_ids_from_raw_json, ma scorre TUTTI i prodotti della query: la ricerca
+    viene divisa per sottocategorie e fasce di prezzo finché ogni pezzo sta sotto il
+    limite di pagine del sito (vedi Vinted.sweep_search).
     """
+    print(f"Sweep completo dei PRODOTTI per query: '{query_text}'...")
+    stats = SweepStats()
+    seller_ids = []
+    seen = set()
     try:
-        if not feedback_list:
-            print("AVVISO: Nessun dato di feedback da salvare.")
-            return
+        for item in vinted.sweep_search(query=query_text, order="newest_first",
+                                        projection=["id", "user.id"], stats=stats):
+            if item.user_id and item.user_id not in seen:
+                seen.add(item.user_id)
+                seller_ids.append(item.user_id)
+                if max_sellers and len(seller_ids) >= max_sellers:
+                    break
+    except Exception as e:
+        print(f"ERRORE GRAVE nello sweep dei prodotti: {e}")
 
-        print(f"\n--- SALVATAGGIO INCREMENTALE IN CORSO ({len(feedback_list)} transazioni) ---")
+    print(f"  {stats.items} prodotti, {len(seller_ids)} venditori, {stats.shards} sotto-ricerche, "
+          f"{stats.pages} pagine")
+    if stats.truncated:
+        print(f"  ATTENZIONE: {len(stats.truncated)} fasce troppo dense, risultati parziali")
+    return seller_ids
 
-        # --- 1. Salvataggio Transazioni (Archi) ---
-        df_transactions = pd.DataFrame(feedback_list)
+def feedback_rows(feedbacks) -> List[Dict[str, Any]]:
+    """
+    Converte i feedback di una pagina negli archi (acquirente -> venditore) salvati
+    nello stato del crawling.
+    """
+    return [
+        {
+            "Acquirente_ID": feedback.feedback_user_id,
+            "Venditore_ID": feedback.user_id,
+            "Rating_Acquirente_V": feedback.rating,
+            "Rating_Venditore_A": None,
+            "Item_ID": feedback.item_id,
+            "Item_Title": feedback.item_title or "",
+        }
+        for feedback in feedbacks
+    ]
 
-        if 'Acquirente_ID' in df_transactions.columns:
-            df_transactions['Acquirente_ID'] = pd.to_numeric(df_transactions['Acquirente_ID'], errors='coerce')
-        if 'Venditore_ID' in df_transactions.columns:
-            df_transactions['Venditore_ID'] = pd.to_numeric(df_transactions['Venditore_ID'], errors='coerce')
+# ========================================================================
+# SALVATAGGIO INCREMENTALE
+# ========================================================================
 
-        # Mappatura dei tag ai dati di transazione (basata sui tag raccolti finora)
-        if 'Acquirente_ID' in df_transactions.columns:
-            df_transactions['Acquirente_Community'] = df_transactions['Acquirente_ID'].map(main_tags_dict).fillna('Sconosciuto')
-        if 'Venditore_ID' in df_transactions.columns:
-            df_transactions['Venditore_Community'] = df_transactions['Venditore_ID'].map(main_tags_dict).fillna('Sconosciuto')
+def save_progress(export_log: TransactionLog, compact: bool = False):
+    """
+    Esporta nei file CSV usati dagli script di analisi gli archi e i tag raccolti
+    dall'ultimo salvataggio (aggiunti in coda, senza riscrivere i file).
+    Con `compact` riscrive i file per intero: una riga per arco e per utente,
+    community aggiornate, più la copia tipizzata in Parquet (usato a fine crawling).
+    """
+    try:
+        if compact:
+            print("\n--- COMPATTAZIONE FINALE DEI CSV ---")
+            export_log.wait()
+            export_log.compact()
+            write_table(read_transactions(FILE_NAME), FILE_NAME, export_csv=False)
+            write_table(read_tags(TAGS_FILE_NAME), TAGS_FILE_NAME, export_csv=False)
+            return
 
-        # Rimuovo duplicati 
-        if {'Acquirente_ID', 'Venditore_ID', 'Item_ID'}.issubset(df_transactions.columns):
-            df_transactions.drop_duplicates(subset=['Acquirente_ID', 'Venditore_ID', 'Item_ID'], inplace=True, keep='last')
+        written = export_log.checkpoint()
+        if not written["edges"] and not written["tags"]:
+            print("AVVISO: Nessun dato nuovo da salvare.")
+            return
+        print(f"\n--- SALVATAGGIO INCREMENTALE: +{written['edges']} transazioni in {FILE_NAME}, "
+              f"+{written['tags']} tag in {TAGS_FILE_NAME} ---")
 
-        df_transactions.to_csv(FILE_NAME, index=False, encoding='utf-8')
-        print(f" Dati transazioni salvati in: {FILE_NAME} ({len(df_transactions)} righe)")
+    except Exception as e:
+        print(f"ERRORE durante il salvataggio incrementale: {e}")
 
-        # --- 2. Salvataggio Tag (Proprietà Nodi) ---
-        df_main_tags = pd.DataFrame(list(main_tags_dict.items()), columns=['Node_ID', 'Main_Tag'])
-        df_detailed_tags = pd.DataFrame(list(detailed_tags_dict.items()), columns=['Node_ID', 'Detailed_Tag'])
+def open_crawl_state() -> CrawlState:
+    """
+    Apre lo stato del crawling su STATE_PATH. Al primo avvio importa i CSV di un
+    crawling precedente (una volta sola: i restart successivi non li rileggono).
+    """
+    state = CrawlState(STATE_PATH)
+    migrate = state.is_empty() and os.path.exists(FILE_NAME)
+    if migrate:
+        print("--- IMPORTAZIONE DATI PRECEDENTI NELLO STATO DEL CRAWLING ---")
+        try:
+            state.import_csv(FILE_NAME, TAGS_FILE_NAME)
+        except Exception as e:
+            print(f"Errore importazione CSV: {e}. Inizio da zero.")
 
-        df_tags = pd.merge(df_main_tags, df_detailed_tags, on='Node_ID', how='outer')
+    state.add_users(SEED_USER_IDS, "seed", seed=True)
 
-        df_tags.to_csv(TAGS_FILE_NAME, index=False, encoding='utf-8')
-        print(f" Dati tag salvati in: {TAGS_FILE_NAME} ({len(df_tags)} utenti)")
+    if migrate:
+        # Come prima: i SEED già taggati (non 'Inattivo') risultano già processati
+        main_tags, _ = state.tags()
+        for user_id in SEED_USER_IDS:
+            if main_tags.get(user_id, "Inattivo") != "Inattivo":
+                state.finish(user_id, "seed")
+    return state
 
-    except Exception as e:
-        print(f"ERRORE durante il salvataggio incrementale: {e}")
+def started(state: CrawlState, user_ids: List[int], phase: str):
+    """
+    Segna ogni utente come in elaborazione quando il download sta per iniziare.
+    """
+    for user_id in user_ids:
+        state.start(user_id, phase)
+        yield user_id
 
 # ========================================================================
 # FUNZIONE DI SCRAPING
@@ -280,313 +327,184 @@ def save_progress(feedback_list: List[Dict[str, Any]], main_tags_dict: Dict[int,
 
 def scrape_data():
 
-    global HAS_RESTARTED
-    CUSTOM_COOKIES_DICT = convert_cookie_string_to_dict(RAW_COOKIE_STRING)
-    vinted = Vinted(domain="it")
-    try:
-        vinted.update_cookies(CUSTOM_COOKIES_DICT)
-    except Exception:
-        try:
-            vinted.cookies = CUSTOM_COOKIES_DICT
-        except Exception:
-            pass
+    vinted = Vinted(domain="it", rate_limiter=create_rate_limiter(RATE_INITIAL, RATE_MAX, RATE_INCREASE), cassette=create_cassette(),
+                    session=create_session(), metrics=create_metrics(),
+                    feedback_store=create_feedback_store())
+    vinted.set_log_sampling(LOG_SAMPLE)
 
-    print("Autenticazione impostata (controlla il cookie). Inizio Crawling...")
-
-    seed_users_list = SEED_USER_IDS.copy()
-    all_users_in_network: Set[int] = set(seed_users_list)
-    all_feedback_data: List[Dict[str, Any]] = []
-
-    # Dizionari per i tag 
-    user_main_tags: Dict[int, str] = {}
-    user_detailed_tags: Dict[int, str] = {}
-
-    # FASE 1: CARICAMENTO DATI VECCHI PER RESTART
-    if os.path.exists(FILE_NAME):
-        print("--- CARICAMENTO DATI PRECEDENTI ---")
-        try:
-            df_old = pd.read_csv(FILE_NAME)
-            all_feedback_data = df_old.to_dict('records')
-            if 'Acquirente_ID' in df_old.columns:
-                all_users_in_network.update(pd.to_numeric(df_old['Acquirente_ID'], errors='coerce').dropna().astype(int).unique())
-            if 'Venditore_ID' in df_old.columns:
-                all_users_in_network.update(pd.to_numeric(df_old['Venditore_ID'], errors='coerce').dropna().astype(int).unique())
-            print(f"Caricate {len(all_feedback_data)} transazioni e {len(all_users_in_network)} utenti totali.")
-        except Exception as e:
-            print(f"Errore caricamento {FILE_NAME}: {e}. Inizio da zero.")
-            all_feedback_data = []
-
-    if os.path.exists(TAGS_FILE_NAME):
-        try:
-            df_tags_old = pd.read_csv(TAGS_FILE_NAME)
-            if 'Node_ID' in df_tags_old.columns and 'Main_Tag' in df_tags_old.columns:
-                user_main_tags = dict(zip(pd.to_numeric(df_tags_old['Node_ID'], errors='coerce').dropna().astype(int), df_tags_old['Main_Tag']))
-            if 'Node_ID' in df_tags_old.columns and 'Detailed_Tag' in df_tags_old.columns:
-                user_detailed_tags = dict(zip(pd.to_numeric(df_tags_old['Node_ID'], errors='coerce').dropna().astype(int), df_tags_old['Detailed_Tag']))
-            print(f"Caricati {len(user_main_tags)} tag utente.")
-        except Exception as e:
-            print(f"Errore caricamento {TAGS_FILE_NAME}: {e}. Inizio da zero.")
-            user_main_tags = {}
-            user_detailed_tags = {}
+    print(f"Cookie di sessione: {COOKIES_PATH}. Inizio Crawling...")
 
+    # FASE 1: STATO DEL CRAWLING (frontiera, tag e archi già raccolti)
+    state = open_crawl_state()
+    export_log = TransactionLog(state, FILE_NAME, TAGS_FILE_NAME)
+    counts = state.counts()
+    print(f"Stato {STATE_PATH}: {counts['edges']} transazioni ({counts['tag_edges']} dalla fase di tagging), "
+          f"{counts['users']} utenti, {counts['tagged']} taggati.")
     print("-----------------------------------")
 
     try:
         # =============================================================
         # FASE 2: ACQUISIZIONE ARCHI (Solo dai SEED)
         # =============================================================
-        print(f"Inizio Fase 2: Acquisizione Archi da {len(seed_users_list)} SEED...")
+        seed_users_list = state.pending("seed")
+        print(f"Inizio Fase 2: Acquisizione Archi da {len(seed_users_list)} SEED da elaborare...")
 
         for current_user_id in seed_users_list:
-            '''
-            if current_user_id in user_main_tags:  # Usiamo i tag come proxy per "già processato"
-                print(f"\nUtente SEED {current_user_id} già processato. Salto.")
-                continue
-            '''
-            if current_user_id in user_main_tags:
-                # Se era taggato come 'Inattivo', forziamo il retagging
-                if user_main_tags[current_user_id] == "Inattivo":
-                    print(f"\nUtente SEED {current_user_id} era Inattivo: forzo retagging.")
-                else:
-                    print(f"\nUtente SEED {current_user_id} già processato ({user_main_tags[current_user_id]}). Salto.")
-                continue
-
             print(f"\nAnalizzo SEED ID: {current_user_id}")
-            item_titles_for_tagging: List[str] = []
 
             try:
-                page = 1
-                while True:
-                    url_feedback = f"{vinted.api_url}/user_feedbacks?user_id={current_user_id}&page={page}&per_page=20&by=all"
-                    response = vinted.scraper.get(url_feedback,
-                                                  headers=getattr(vinted, "headers", {}),
-                                                  cookies=getattr(vinted, "cookies", {}),
-                                                  proxies=getattr(vinted, "proxy", None))
-                    response.raise_for_status()
-                    raw_json_data = response.json()
-
-                    if 'user_feedbacks' not in raw_json_data or not raw_json_data['user_feedbacks']:
-                        print(f" -> Nessun feedback trovato per {current_user_id} a pagina {page}. Interrompo.")
-                        break
-
-                    for feedback in raw_json_data['user_feedbacks']:
-                        item_title = feedback.get('item_title') or ""
-                        item_titles_for_tagging.append(item_title)
-
-                        data_row = {
-                            "Acquirente_ID": feedback.get('feedback_user_id'),
-                            "Venditore_ID": feedback.get('user_id'),
-                            "Rating_Acquirente_V": feedback.get('rating'),
-                            "Rating_Venditore_A": None,
-                            "Item_ID": feedback.get('item_id'),
-                        }
-                        all_feedback_data.append(data_row)
-
-                        # Aggiorno il set degli utenti 
-                        try:
-                            if data_row["Acquirente_ID"] is not None:
-                                all_users_in_network.add(int(data_row["Acquirente_ID"]))
-                        except Exception:
-                            pass
-                        try:
-                            if data_row["Venditore_ID"] is not None:
-                                all_users_in_network.add(int(data_row["Venditore_ID"]))
-                        except Exception:
-                            pass
-
-                    pagination = raw_json_data.get('pagination')
-                    if not pagination or pagination.get('current_page', page) >= pagination.get('total_pages', page):
-                        break
-
-                    page += 1
-                    sleep_duration = random.randint(SEED_MIN_SLEEP, SEED_MAX_SLEEP)
-                    print(f" -> Pausa di {sleep_duration}s tra le pagine di feedback (fase SEED)...")
-                    time.sleep(sleep_duration)
-
-
-                # Assegniamo i 2 tag al SEED 
+                # Si riparte dalla pagina successiva all'ultima salvata: nessuna pagina
+                # viene scaricata due volte. Le pagine successive vengono scaricate in
+                # anticipo mentre salviamo quella corrente.
+                last_page = state.start(current_user_id, "seed")
+                if last_page:
+                    print(f" -> Ripresa dalla pagina {last_page + 1}.")
+                pages = paginate_pages(
+                    lambda page: vinted.user_feedbacks(current_user_id, page=page, projection=FEEDBACK_FIELDS),
+                    "user_feedbacks",
+                    start_page=last_page + 1,
+                )
+                for page, feedbacks in pages:
+                    # Archi, nuovi utenti (in coda per il tagging) e pagina in un'unica transazione
+                    state.record_page(current_user_id, "seed", page, feedback_rows(feedbacks))
+
+                item_titles_for_tagging = state.item_titles(current_user_id)
+                if not item_titles_for_tagging:
+                    print(f" -> Nessun feedback trovato per {current_user_id}.")
+
+                # Assegniamo i 2 tag al SEED (che non verrà ritaggato nella Fase 3)
                 main_tag, detailed_tag = assign_community_tag(item_titles_for_tagging)
-                user_main_tags[current_user_id] = main_tag
-                user_detailed_tags[current_user_id] = detailed_tag
+                state.finish(current_user_id, "seed", main_tag, detailed_tag)
+                state.finish(current_user_id, "tag", main_tag, detailed_tag)
                 print(f" -> Tag Assegnati al SEED: Main='{main_tag}', Detailed='{detailed_tag}'")
 
             except Exception as e:
                 print(f"ERRORE durante lo scraping di {current_user_id}: {e}")
+                state.finish(current_user_id, "seed", error=str(e))
                 if "403" in str(e):
                     print("!!! BLOCCO 403 RILEVATO. SALVATAGGIO IN CORSO... !!!")
-                    save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
+                    save_progress(export_log)
                     break
 
             # Salvataggio incrementale (dopo ogni SEED)
-            save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
-
-            sleep_duration = random.randint(SEED_MIN_SLEEP, SEED_MAX_SLEEP)
-            print(f"PAUSA di {sleep_duration}s tra i SEED (fase SEED)...")
-            time.sleep(sleep_duration)
+            save_progress(export_log)
+            print(f"Rate attuale: {vinted.rate_limiter.rate:.3f} req/s (fase SEED)")
+            export_metrics(vinted)
         # =============================================================
         # FASE 3: ACQUISIZIONE TAGGING 
         # =============================================================
-        print(f"\n--- Inizio Fase 3: Tagging di {len(all_users_in_network)} nodi totali ---")
 
         # --- SISTEMA DI RESUME ---
+        # Lo stato ricorda chi è già taggato: si elaborano solo gli utenti in coda,
+        # quelli interrotti a metà e i falliti ('Inattivo') con tentativi residui.
         TAG_SAVE_EVERY = 10
         FORZA_RETAGGING = False  
 
-        # Carica i tag già esistenti
-        done_tags = {}
-        if os.path.exists(TAGS_FILE_NAME):
-            try:
-                with open(TAGS_FILE_NAME, "r", encoding="utf-8") as f:
-                    next(f)
-                    for line in f:
-                        try:
-                            node_id, main_tag, detailed_tag = line.strip().split(",")
-                            done_tags[int(node_id)] = (main_tag, detailed_tag)
-                        except:
-                            continue
-                print(f" Resume attivo: trovati {len(done_tags)} utenti già taggati.")
-            except Exception as e:
-                print(f" Errore lettura file tag per resume: {e}")
-        else:
-            print(" Nessun file tag precedente trovato. Parto da zero.")
-
-        # Costruisci la lista dei nodi da taggare
-        nodes_to_tag = []
-        for uid in all_users_in_network:
-            if uid is None:
-                continue
-            if not FORZA_RETAGGING and uid in done_tags:
-                continue
-            nodes_to_tag.append(uid)
-
-        print(f" Totale utenti da taggare in questo run: {len(nodes_to_tag)}")
-      
- 
+        if FORZA_RETAGGING:
+            state.retry("tag")
+
         # FASE DI RECUPERO: se esistono utenti Inattivi, ritaggiamo solo quelli
 
         retry_inactive_only = False  # imposta False se vuoi rifare tutto
         if retry_inactive_only:
-            try:
-                df_tags = pd.read_csv(TAGS_FILE_NAME)
-                if 'Node_ID' in df_tags.columns and 'Main_Tag' in df_tags.columns:
-                    inactive_users = (
-                        df_tags[df_tags['Main_Tag'].astype(str).str.strip().str.lower() == "inattivo"]
-                        ['Node_ID']
-                        .dropna()
-                        .astype(int)
-                        .tolist()
-                    )
-                    if inactive_users:
-                        print(f" Modalità RECUPERO ATTIVA → {len(inactive_users)} utenti 'Inattivo' verranno ritaggati.")
-                        nodes_to_tag = inactive_users  # sovrascrive la lista da processare
-                    else:
-                        print(" Nessun utente 'Inattivo' trovato. Procedo normalmente.")
-                else:
-                    print(" File tag privo di colonne attese ('Node_ID', 'Main_Tag'). Procedo normalmente.")
-            except Exception as e:
-                print(f"Errore durante il caricamento utenti inattivi: {e}")
+            main_tags, _ = state.tags()
+            inactive_users = [uid for uid, tag in main_tags.items() if str(tag).strip().lower() == "inattivo"]
+            if inactive_users:
+                print(f" Modalità RECUPERO ATTIVA → {len(inactive_users)} utenti 'Inattivo' verranno ritaggati.")
+                state.retry("tag", inactive_users)
+                nodes_to_tag = inactive_users  # sovrascrive la lista da processare
+            else:
+                print(" Nessun utente 'Inattivo' trovato. Procedo normalmente.")
+                nodes_to_tag = state.pending("tag")
+        else:
+            nodes_to_tag = state.pending("tag")
+
+        counts = state.counts()
+        print(f"\n--- Inizio Fase 3: Tagging di {counts['users']} nodi totali ---")
 
         # --- CICLO DI TAGGING ---
         
-        print(f"Nodi già taggati: {len(user_main_tags)}. Nodi da taggare: {len(nodes_to_tag)}")
+        print(f"Nodi già taggati: {counts['tagged']}. Nodi da taggare: {len(nodes_to_tag)}")
 
         save_counter_fase3 = 0  # Contatore per salvataggio incrementale Fase 3
 
-        for i, user_id in enumerate(nodes_to_tag):
+        # USIAMO I FEEDBACK PER IL TAGGING 
+        # Limitiamo il tagging alle prime 3 pagine (60 feedback) per velocità.
+        # I risultati arrivano man mano che i download terminano (non in ordine);
+        # gli errori temporanei (429, 5xx, connessione) vengono già ritentati dal client.
+        tag_results = vinted.user_feedbacks_many(
+            started(state, nodes_to_tag, "tag"), max_pages=3, projection=FEEDBACK_FIELDS,
+            max_workers=TAG_WORKERS
+        )
+
+        for i, result in enumerate(tag_results):
+            user_id = result.key
             print(f"\nTagging Utente {i+1}/{len(nodes_to_tag)} (ID: {user_id})")
 
-            item_titles_for_tagging: List[str] = []
-
             try:
-                # USIAMO I FEEDBACK PER IL TAGGING 
-                page = 1
-                while True:
-                    url_feedback = f"{vinted.api_url}/user_feedbacks?user_id={user_id}&page={page}&per_page=20&by=all"
-                    response = vinted.scraper.get(url_feedback,
-                                                  headers=getattr(vinted, "headers", {}),
-                                                  cookies=getattr(vinted, "cookies", {}),
-                                                  proxies=getattr(vinted, "proxy", None))
-                    response.raise_for_status()
-                    raw_json_data = response.json()
-
-                    if 'user_feedbacks' not in raw_json_data or not raw_json_data['user_feedbacks']:
-                        break  # Nessun feedback trovato
+                if not result.ok:
+                    raise result.error
 
-                    for feedback in raw_json_data['user_feedbacks']:
-                        item_title = feedback.get('item_title') or ""
-                        item_titles_for_tagging.append(item_title)
+                item_titles_for_tagging: List[str] = [feedback.item_title or "" for feedback in result.value]
 
-                    pagination = raw_json_data.get('pagination')
-
-                    # Limitiamo il tagging alle prime 3 pagine (60 feedback) per velocità
-                    if not pagination or pagination.get('current_page', page) >= pagination.get('total_pages', page) or page >= 3:
-                        break
-
-                    page += 1
-                    time.sleep(random.randint(5, 10))  # Pausa breve tra le pagine
+                # Gli stessi feedback sono archi del grafo: si salvano senza altre richieste
+                new_edges = state.record_edges(
+                    feedback_rows(result.value), hop="tag",
+                    discovered_phase="tag" if TAG_HOP_DISCOVERY else None
+                )
 
                 # Assegniamo i tag
                 main_tag, detailed_tag = assign_community_tag(item_titles_for_tagging)
-                user_main_tags[user_id] = main_tag
-                user_detailed_tags[user_id] = detailed_tag
-                print(f" -> Tag Assegnati: Main='{main_tag}', Detailed='{detailed_tag}'")
+                state.finish(user_id, "tag", main_tag, detailed_tag)
+                print(f" -> Tag Assegnati: Main='{main_tag}', Detailed='{detailed_tag}' (+{new_edges} archi)")
 
             except Exception as e:
                 err_str = str(e)
                 print(f"Errore durante il tagging di {user_id}: {err_str}")
 
-                # Se troviamo un 401, proviamo un riavvio controllato UNA SOLA VOLTA
-                if ("401" in err_str or "Unauthorized" in err_str) and not HAS_RESTARTED:
-                    print("Errore 401 rilevato — probabile cookie scaduto o sessione invalidata.")
-                    print("Riavvio automatico del programma tra 10 secondi...")
-
-                    # Segna che ci siamo già riavviati una volta
-                    HAS_RESTARTED = True
-
-                    # Salva lo stato parziale prima di riavviare
-                    save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
-                    time.sleep(10)
-
-                    # Riavvia lo script con gli stessi argomenti
-                    os.execv(sys.executable, [sys.executable] + sys.argv)
-
-                else:
-                    # Tutti gli altri errori o 401 successivi → marcare come Inattivo
-                    user_main_tags[user_id] = "Inattivo"
-                    user_detailed_tags[user_id] = "Inattivo"
-                    print(f" Errore gestito su {user_id}: marcato come 'Inattivo'.")
+                # Un 401 arriva fin qui solo se il client ha già rinnovato la sessione
+                # senza successo (o se i cookie sono forzati con VINTED_COOKIE_STRING):
+                # riavviare il processo con gli stessi cookie non servirebbe. Come ogni
+                # altro errore l'utente viene marcato 'Inattivo' e ritentato ai prossimi
+                # avvii finché restano tentativi
+                if "401" in err_str or "Unauthorized" in err_str:
+                    print("Errore 401: sessione non rinnovabile, controlla i cookie.")
+                state.finish(user_id, "tag", "Inattivo", "Inattivo", error=err_str)
+                print(f" Errore gestito su {user_id}: marcato come 'Inattivo'.")
 
 
             save_counter_fase3 += 1
             # Salvataggio incrementale dei TAG 
-            if save_counter_fase3 % 10 == 0:
-                save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
-
-            sleep_duration = random.randint(TAG_MIN_SLEEP, TAG_MAX_SLEEP)
-            print(f"PAUSA di {sleep_duration}s tra il tagging (fase TAG)...")
-            time.sleep(sleep_duration)
+            if save_counter_fase3 % TAG_SAVE_EVERY == 0:
+                save_progress(export_log)
+                print(f"Rate attuale: {vinted.rate_limiter.rate:.3f} req/s (fase TAG)")
+                export_metrics(vinted)
 
     except KeyboardInterrupt:
         print("\nInterruzione manuale rilevata (Ctrl+C). Salvataggio...")
 
     finally:
         # BLOCCO SALVATAGGIO (FINALE)
-        save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
+        save_progress(export_log)
+        export_metrics(vinted)
         print("Salvataggio finale completato.")
     # ===========================================================
     # SALVATAGGIO FINALE DOPO RITAGGING INATTIVI
     # ===========================================================
     try:
         print("\n Salvataggio finale dopo ritagging inattivi...")
-        save_progress(all_feedback_data, user_main_tags, user_detailed_tags)
-        print(f" Dati tag aggiornati: {len(user_main_tags)} utenti totali salvati.")
+        save_progress(export_log, compact=True)
+        print(f" Dati tag aggiornati: {state.counts()['tagged']} utenti totali salvati.")
     except Exception as e:
         print(f" Errore durante il salvataggio finale dei tag aggiornati: {e}")
+    finally:
+        state.close()
 
 # ==============================================================================
 # SEZIONE DI ESECUZIONE
 # ==============================================================================
 if __name__ == "__main__":
+    setup_logging()
     '''
     #  RACCOLTA AUTOMATICA SEED 
     # ---------------------------------------------------------------
@@ -595,10 +513,13 @@ if __name__ == "__main__":
     #
     #
     found_ids = []
+    vinted = Vinted(domain="it", rate_limiter=create_rate_limiter(RATE_INITIAL, RATE_MAX, RATE_INCREASE), cassette=create_cassette(),
+                    session=create_session(), metrics=create_metrics())
+    vinted.catalog_index("vinted_catalogs_it.json")  # Permette di dividere lo sweep per sottocategorie
     for query in INTEREST_QUERIES:
-        ids = find_ids_from_raw_json(query)  # <--- Usa la funzione per cercare ID venditori
+        ids = find_ids_from_raw_json(query, vinted)  # <--- Usa la funzione per cercare ID venditori
+        # ids = find_seed_ids_by_sweep(query, vinted, max_sellers=200)  # <--- Alternativa esaustiva
         found_ids.extend(ids)
-        time.sleep(1)
     
     print("\n" + "="*50)
     print(f"ID UTENTI RACCOLTI TOTALI (da usare come SEED): {found_ids}")
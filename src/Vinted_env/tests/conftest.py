@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scripts and pipeline modules (crawl_state, transaction_log, ...) are imported
+# from the directory above, like when they are run from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
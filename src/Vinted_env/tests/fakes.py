@@ -0,0 +1,48 @@
+import json
+from typing import Callable, List
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from vinted import Vinted
+
+
+def json_response(body, status_code: int = 200, url: str = "") -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode()
+    response.headers["Content-Type"] = "application/json"
+    response.encoding = "utf-8"
+    response.url = url
+    return response
+
+
+def query_params(url: str) -> dict:
+    return {k: v[0] for k, v in parse_qs(urlsplit(url).query, keep_blank_values=True).items()}
+
+
+class FakeScraper(requests.Session):
+    """
+    Stand-in for the cloudscraper session: every request is answered by
+    `handler(url)` and recorded in `calls`.
+    """
+
+    def __init__(self, handler: Callable[[str], requests.Response]) -> None:
+        super().__init__()
+        self.handler = handler
+        self.calls: List[str] = []
+
+    def request(self, method, url, *args, **kwargs):
+        self.calls.append(url)
+        return self.handler(url)
+
+
+def fake_vinted(handler: Callable[[str], requests.Response], **kwargs) -> Vinted:
+    """
+    Vinted client answered by `handler`, with an empty pinned cookie jar so that no
+    handshake is performed.
+    """
+    vinted = Vinted(domain=kwargs.pop("domain", "it"), **kwargs)
+    vinted.scraper = FakeScraper(handler)
+    vinted.cookies = {}
+    return vinted
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+
+from fakes import fake_vinted, json_response
+
+from vinted.async_vinted import AsyncVinted
+
+
+def test_requests_run_concurrently_up_to_the_limit():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def handler(url):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return json_response({"user": {"id": 1}}, url=url)
+
+    async def main():
+        async with AsyncVinted(client=fake_vinted(handler), max_concurrency=3) as vinted:
+            await asyncio.gather(*(vinted.user_info(i) for i in range(9)))
+
+    asyncio.run(main())
+    assert peak == 3
+
+
+def test_client_is_usable_after_close():
+    vinted = AsyncVinted(client=fake_vinted(lambda url: json_response({"user": {"id": 1}}, url=url)))
+
+    async def call():
+        return await vinted.user_feedbacks(1, raw=True)
+
+    asyncio.run(call())
+    vinted.close()
+    assert asyncio.run(call()) == {"user": {"id": 1}}
+    vinted.close()
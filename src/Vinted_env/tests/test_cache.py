@@ -0,0 +1,51 @@
+from urllib.parse import urlsplit
+
+from fakes import fake_vinted, json_response
+
+from vinted.cache import ResponseCache
+
+
+def suggestions(language):
+    """
+    Handler answering search suggestions with the domain and `language` of the
+    request as title.
+    """
+
+    def handler(url):
+        title = f"{urlsplit(url).netloc} {language}"
+        return json_response(
+            {
+                "code": 0,
+                "pagination": None,
+                "search_suggestions": [
+                    {
+                        "title": title,
+                        "total_score": 1,
+                        "origin_id": 1,
+                        "params": [],
+                        "suggestion_id": 1,
+                        "suggestion_type": 1,
+                    }
+                ],
+            },
+            url=url,
+        )
+
+    return handler
+
+
+def test_cache_keeps_domains_and_languages_apart(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    clients = [
+        fake_vinted(suggestions(language), domain=domain, language=language, cache=cache)
+        for domain, language in [("it", "it-IT"), ("fr", "it-IT"), ("it", "fr-FR")]
+    ]
+
+    titles = [client.search_suggestions("nike").search_suggestions[0].title for client in clients]
+    assert titles == ["www.vinted.it it-IT", "www.vinted.fr it-IT", "www.vinted.it fr-FR"]
+
+    # Each client is now served its own entry from the shared cache
+    for client, title in zip(clients, titles):
+        assert client.search_suggestions("nike").search_suggestions[0].title == title
+        assert len(client.scraper.calls) == 1
+    cache.close()
@@ -0,0 +1,90 @@
+import pytest
+from fakes import fake_vinted, json_response, query_params
+
+from get_recensioni_venditori_FINAL import resolve_counter_reviews
+from vinted.feedback_store import FeedbackStore
+
+BUYER = 1
+PER_PAGE = 20
+
+
+def feedback_pages(feedbacks, per_page=2):
+    """
+    Handler serving `feedbacks` ((author, item, rating), newest first) as
+    /user_feedbacks pages of `per_page` entries.
+    """
+
+    def handler(url):
+        page = int(query_params(url)["page"])
+        chunk = feedbacks[(page - 1) * per_page : page * per_page]
+        return json_response(
+            {
+                "user_feedbacks": [
+                    {"id": i, "feedback_user_id": author, "user_id": BUYER, "item_id": item, "rating": rating}
+                    for i, (author, item, rating) in enumerate(chunk)
+                ],
+                "pagination": {
+                    "current_page": page,
+                    "per_page": per_page,
+                    "time": 0,
+                    "total_entries": len(feedbacks),
+                    "total_pages": (len(feedbacks) + per_page - 1) // per_page,
+                },
+            },
+            url=url,
+        )
+
+    return handler
+
+
+FEEDBACKS = [
+    (10, 100, 5),
+    (30, 300, 2),
+    (10, 101, 3),
+    (20, 200, 4),
+    (40, 400, 1),
+    (50, 500, 1),
+]
+
+
+def test_rows_resolved_per_item_and_seller():
+    vinted = fake_vinted(feedback_pages(FEEDBACKS))
+    rows = [(10, 100), (10, 101), (20, None), (99, 900)]
+
+    assert resolve_counter_reviews(vinted, BUYER, rows) == [5, 3, 4, 0]
+    # Seller 99 never left a feedback: every page is read
+    assert len(vinted.scraper.calls) == 3
+
+
+def test_pagination_stops_once_every_row_is_resolved():
+    vinted = fake_vinted(feedback_pages(FEEDBACKS))
+
+    assert resolve_counter_reviews(vinted, BUYER, [(10, 100), (10, 101)]) == [5, 3]
+    assert len(vinted.scraper.calls) == 2
+
+
+def test_missing_item_falls_back_to_the_seller_feedback():
+    vinted = fake_vinted(feedback_pages(FEEDBACKS))
+
+    assert resolve_counter_reviews(vinted, BUYER, [(30, 999)]) == [2]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeedbackStore(str(tmp_path / "feedbacks.sqlite"), max_age=0)
+    yield store
+    store.close()
+
+
+def test_store_hit_for_one_item_does_not_resolve_the_others(store):
+    vinted = fake_vinted(feedback_pages(FEEDBACKS), feedback_store=store)
+    # A previous stage stored the first page: seller 10 for item 100 only
+    resolve_counter_reviews(vinted, BUYER, [(10, 100)])
+    vinted.scraper.calls.clear()
+
+    assert resolve_counter_reviews(vinted, BUYER, [(10, 100), (10, 101)]) == [5, 3]
+    assert vinted.scraper.calls
+    # The same rows now come from the store alone
+    vinted.scraper.calls.clear()
+    assert resolve_counter_reviews(vinted, BUYER, [(10, 101), (10, 100)]) == [3, 5]
+    assert vinted.scraper.calls == []
@@ -0,0 +1,84 @@
+import sqlite3
+
+from crawl_state import CrawlState
+
+
+def edge(buyer_id, seller_id, item_id, rating=5):
+    return {
+        "Acquirente_ID": buyer_id,
+        "Venditore_ID": seller_id,
+        "Rating_Acquirente_V": rating,
+        "Rating_Venditore_A": None,
+        "Item_ID": item_id,
+        "Item_Title": f"item {item_id}",
+    }
+
+
+def test_resume_after_interruption(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    state = CrawlState(path)
+    state.add_users([1, 2], "seed", seed=True)
+
+    assert state.start(1, "seed") == 0
+    state.record_page(1, "seed", 1, [edge(10, 1, 100), edge(11, 1, 101)])
+    state.record_page(1, "seed", 2, [edge(12, 1, 102, rating=4)])
+    state.close()  # interrupted before finish()
+
+    state = CrawlState(path)
+    assert state.pending("seed") == [1, 2]
+    assert state.status(1, "seed") == "in_progress"
+    # The download continues after the last saved page
+    assert state.start(1, "seed") == 2
+    assert [(e["Acquirente_ID"], e["Rating_Acquirente_V"], e["Rating_Venditore_A"]) for e in state.iter_edges()] == [
+        (10, 5, None),
+        (11, 5, None),
+        (12, 4, None),
+    ]
+    # Users found on the pages, the seed included, are queued for tagging
+    assert state.pending("tag") == [1, 10, 11, 12]
+
+    state.finish(1, "seed")
+    assert state.pending("seed") == [2]
+    state.close()
+
+
+def test_failed_users_are_retried_up_to_max_attempts(tmp_path):
+    state = CrawlState(str(tmp_path / "state.sqlite"), max_attempts=2)
+    state.add_users([1], "tag")
+
+    for _ in range(2):
+        assert state.pending("tag") == [1]
+        state.start(1, "tag")
+        state.finish(1, "tag", error="HTTP 500")
+
+    assert state.pending("tag") == []
+    assert state.retry("tag", [1]) == 1
+    assert state.pending("tag") == [1]
+    state.close()
+
+
+def test_text_ratings_are_migrated_to_integers(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE edges (buyer_id INTEGER, seller_id INTEGER, item_id INTEGER,
+                            rating_buyer TEXT, rating_seller TEXT, item_title TEXT,
+                            fetched_at REAL NOT NULL, hop TEXT NOT NULL DEFAULT 'seed');
+        CREATE UNIQUE INDEX edges_key ON edges (buyer_id, seller_id, IFNULL(item_id, -1));
+        CREATE INDEX edges_seller ON edges (seller_id);
+        INSERT INTO edges VALUES (10, 1, 100, 5, NULL, 'a', 0, 'seed');
+        INSERT INTO edges VALUES (11, 1, NULL, '4', '3', 'b', 0, 'tag');
+        DELETE FROM edges WHERE buyer_id = 10;
+        INSERT INTO edges VALUES (10, 1, 100, 2, NULL, 'a', 0, 'seed');
+        """
+    )
+    conn.commit()
+    conn.close()
+
+    state = CrawlState(path)
+    rows = [(e["Acquirente_ID"], e["Rating_Acquirente_V"], e["Rating_Venditore_A"]) for e in state.iter_edges()]
+    assert rows == [(11, 4, 3), (10, 2, None)]
+    # Rowids are kept, so incremental export positions stay valid
+    assert state.last_edge_rowid() == 3
+    state.close()
@@ -0,0 +1,118 @@
+import pytest
+from dacite import from_dict
+from dacite.exceptions import MissingValueError
+
+from vinted.decoders import decode
+from vinted.exceptions import DecodeError
+from vinted.models.filters import Catalog, FiltersResponse
+from vinted.models.search import SearchSuggestionsResponse
+
+FILTERS = {
+    "code": 0,
+    "pagination": None,
+    "filters": [
+        {
+            "id": 1,
+            "title": "Taglia",
+            "code": "size",
+            "display_type": "list",
+            "selection_type": "multi",
+            # is_selection_highlighted, is_new_filter and search_translations are missing
+            "options": [
+                {
+                    "id": 10,
+                    "title": "Donna",
+                    "type": "group",
+                    "options": [
+                        {"id": 11, "title": "S", "type": "default", "options": None},
+                        {"id": 12, "title": "M", "type": "default", "options": []},
+                    ],
+                },
+            ],
+            "position": 0,
+        },
+        {
+            "id": 2,
+            "title": "Prezzo",
+            "code": "price",
+            "display_type": "hybrid_price",
+            "selection_type": "default",
+            "is_selection_highlighted": True,
+            "is_new_filter": False,
+            "search_translations": {"placeholder": None, "no_results": {"body": "b", "title": "t"}},
+            "options": [],
+            "position": 1,
+        },
+    ],
+    "selected_filters": [{"code": "size", "ids": [11]}],
+}
+
+SUGGESTIONS = {
+    "code": 0,
+    "pagination": {"current_page": 1, "per_page": 20, "time": 0, "total_entries": 1, "total_pages": 1},
+    "search_suggestions": [
+        {
+            "title": "nike",
+            "total_score": 3,
+            "origin_id": 7,
+            "params": [{"title": ["nike"], "entity_combination": [], "source": ["brand"], "search_signals": []}],
+            "suggestion_id": 1,
+            "suggestion_type": 2,
+        }
+    ],
+}
+
+
+def catalog(catalog_id, children=None):
+    return {
+        "id": catalog_id,
+        "title": f"Catalogo {catalog_id}",
+        "code": f"C{catalog_id}",
+        "size_group_ids": [],
+        "multiple_size_group_ids": None,
+        "leaf_multiple_size_group_ids": None,
+        "shippable": True,
+        "author_field_visibility": 0,
+        "brand_field_visibility": 1,
+        "book_title_field_visibility": 0,
+        "color_field_visibility": 1,
+        "isbn_field_visibility": 0,
+        "size_field_visibility": 1,
+        "video_game_rating_field_visibility": 0,
+        "measurements_field_visibility": False,
+        "condition_field_visible": True,
+        "restricted_to_status_id": None,
+        "landing": None,
+        "allow_browsing_subcategories": True,
+        "badge": None,
+        "package_size_ids": [1],
+        "order": catalog_id,
+        "item_count": 100,
+        "photo": {"url": "https://example.com/c.jpg", "thumbnails": None},
+        "unisex_catalog_id": None,
+        "catalogs": children,
+        "url": f"/catalog/{catalog_id}",
+        "url_en": f"/catalog/{catalog_id}",
+    }
+
+
+@pytest.mark.parametrize(
+    "model, data",
+    [
+        (FiltersResponse, FILTERS),
+        (SearchSuggestionsResponse, SUGGESTIONS),
+        (Catalog, catalog(1, [catalog(2, [catalog(3)]), catalog(4, [])])),
+    ],
+)
+def test_decode_matches_dacite(model, data):
+    assert decode(model, data) == from_dict(model, data)
+
+
+def test_decode_missing_field_raises_like_dacite():
+    data = catalog(1)
+    del data["title"]
+
+    with pytest.raises(MissingValueError):
+        from_dict(Catalog, data)
+    with pytest.raises(DecodeError, match="title"):
+        decode(Catalog, data)
@@ -0,0 +1,25 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmark import DESCRIPTION_CASES
+from vinted.description import extract_description
+
+
+def with_bs4(html):
+    div = BeautifulSoup(html, "html.parser").find("div", {"itemprop": "description"})
+    return div.get_text(strip=True) if div else None
+
+
+@pytest.mark.parametrize("html", DESCRIPTION_CASES)
+def test_extract_description_matches_bs4(html):
+    assert extract_description(html) == with_bs4(html)
+
+
+def test_extract_description_ignores_the_rest_of_the_page():
+    html = (
+        '<html><head><title>Item</title></head><body><div class="item">'
+        '<div itemprop="description"><span>Taglia M,</span> mai usato</div>'
+        "</div><footer><div itemprop=\"description\">other</div></footer></body></html>"
+    )
+
+    assert extract_description(html) == with_bs4(html) == "Taglia M,mai usato"
@@ -0,0 +1,64 @@
+import csv
+
+from crawl_state import CrawlState
+from transaction_log import CsvLog, TransactionLog, read_transactions
+
+
+def edge(buyer_id, seller_id, item_id, rating=5):
+    return {
+        "Acquirente_ID": buyer_id,
+        "Venditore_ID": seller_id,
+        "Rating_Acquirente_V": rating,
+        "Rating_Venditore_A": None,
+        "Item_ID": item_id,
+    }
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_append_drops_truncated_last_line(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_bytes(b"a,b\n1,2\n3,")  # crash in the middle of a row
+
+    CsvLog(str(path), ["a", "b"]).append([{"a": 5, "b": 6}])
+
+    assert path.read_bytes() == b"a,b\n1,2\n5,6\r\n"
+
+
+def test_checkpoint_appends_and_compaction_deduplicates(tmp_path):
+    state = CrawlState(str(tmp_path / "state.sqlite"))
+    transactions = str(tmp_path / "transactions.csv")
+    tags = str(tmp_path / "tags.csv")
+    state.record_edges([edge(10, 1, 100), edge(11, 1, 101)], hop="seed")
+
+    log = TransactionLog(state, transactions, tags, background=False)
+    assert len(read_rows(transactions)) == 2
+
+    # Only the changes are appended: the updated edge appears twice in the log
+    state.record_page(1, "seed", 1, [edge(10, 1, 100, rating=1), edge(12, 1, 102)])
+    state.finish(1, "tag", main_tag="Moda", detailed_tag="Scarpe")
+    assert log.checkpoint() == {"edges": 2, "tags": 1}
+    rows = read_rows(transactions)
+    assert [(r["Acquirente_ID"], r["Rating_Acquirente_V"]) for r in rows] == [
+        ("10", "5"), ("11", "5"), ("10", "1"), ("12", "5"),
+    ]
+    latest = read_transactions(transactions)
+    assert sorted(zip(latest["Acquirente_ID"], latest["Rating_Acquirente_V"])) == [(10, 1), (11, 5), (12, 5)]
+
+    # A new log on the same state resumes from the saved positions
+    log = TransactionLog(state, transactions, tags, background=False)
+    assert log.checkpoint() == {"edges": 0, "tags": 0}
+
+    log.compact()
+    rows = read_rows(transactions)
+    assert sorted((r["Acquirente_ID"], r["Rating_Acquirente_V"]) for r in rows) == [
+        ("10", "1"), ("11", "5"), ("12", "5"),
+    ]
+    # Communities are rewritten with the tags known at compaction time
+    assert {r["Venditore_Community"] for r in rows} == {"Moda"}
+    assert read_rows(tags) == [{"Node_ID": "1", "Main_Tag": "Moda", "Detailed_Tag": "Scarpe"}]
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []
+    state.close()
@@ -0,0 +1,75 @@
+from fakes import fake_vinted, json_response, query_params
+
+from vinted.watch import ListingWatcher
+
+PER_PAGE = 4
+
+
+def catalog(listings):
+    """
+    Handler serving `listings` (item ids, newest first) as catalog pages.
+    """
+
+    def handler(url):
+        params = query_params(url)
+        page = int(params["page"])
+        items = listings[(page - 1) * PER_PAGE : page * PER_PAGE]
+        total_pages = (len(listings) + PER_PAGE - 1) // PER_PAGE
+        return json_response(
+            {
+                "items": [{"id": item_id} for item_id in items],
+                "pagination": {
+                    "current_page": page,
+                    "per_page": PER_PAGE,
+                    "time": 0,
+                    "total_entries": len(listings),
+                    "total_pages": total_pages,
+                },
+            },
+            url=url,
+        )
+
+    return handler
+
+
+def test_first_poll_only_sets_the_high_water_mark():
+    vinted = fake_vinted(catalog([20, 19, 18, 17, 16, 15]))
+    watcher = ListingWatcher(vinted, per_page=PER_PAGE, projection=["id"])
+    key = watcher.watch(query="nike")
+
+    assert watcher.poll_query(key) == []
+    assert watcher.queries[key].high_water == 20
+    assert len(vinted.scraper.calls) == 1
+
+
+def test_poll_stops_after_known_streak():
+    listings = [20, 19, 18, 17, 16, 15, 14, 13, 12, 11, 10, 9]
+    vinted = fake_vinted(catalog(listings))
+    watcher = ListingWatcher(vinted, per_page=PER_PAGE, stop_after_known=3, projection=["id"])
+    key = watcher.watch(query="nike")
+    watcher.queries[key].high_water = 20
+
+    # Three new listings, then a bumped old one, then known ones
+    listings[:0] = [23, 22, 5, 21]
+    new_ids = [item.id for item in watcher.poll_query(key)]
+
+    assert new_ids == [23, 22, 21]
+    assert watcher.queries[key].high_water == 23
+    # The known streak is reached on the second page: the third is never requested
+    assert [query_params(url)["page"] for url in vinted.scraper.calls] == ["1", "2"]
+
+
+def test_watched_url_is_polled_newest_first():
+    vinted = fake_vinted(catalog([20, 19, 18]))
+    watcher = ListingWatcher(vinted, per_page=PER_PAGE, projection=["id"])
+    key = watcher.watch(
+        url="https://www.vinted.it/catalog/1904-women?search_text=nike&order=relevance&price_to=20",
+        order="price_low_to_high",
+    )
+    watcher.poll_query(key)
+
+    params = query_params(vinted.scraper.calls[0])
+    assert params["order"] == "newest_first"
+    assert params["search_text"] == "nike"
+    assert params["catalog_ids"] == "1904"
+    assert "order" not in key
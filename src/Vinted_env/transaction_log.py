@@ -0,0 +1,266 @@
+import csv
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from crawl_state import CrawlState
+from dataset_io import read_table
+
+# ========================================================================
+# ESPORTAZIONE INCREMENTALE DEI CSV (log append-only + compattazione)
+# ========================================================================
+#
+# I CSV letti dagli script di analisi sono trattati come log: a ogni checkpoint si
+# aggiungono in coda solo gli archi e i tag cambiati dall'ultimo checkpoint
+# (posizioni salvate nello stato del crawling), quindi il costo di un salvataggio
+# dipende da quanto è cambiato e non dalla dimensione del dataset.
+#
+# Nel log una stessa chiave può comparire più volte: vale l'ultima riga (archi su
+# Acquirente_ID, Venditore_ID, Item_ID; tag su Node_ID). La compattazione riscrive i
+# file senza duplicati e con le community aggiornate; parte in background quando le
+# righe aggiunte superano quelle dell'ultima compattazione (I/O totale lineare).
+
+TRANSACTION_COLUMNS = [
+    "Acquirente_ID",
+    "Venditore_ID",
+    "Rating_Acquirente_V",
+    "Rating_Venditore_A",
+    "Item_ID",
+    "Acquirente_Community",
+    "Venditore_Community",
+    "Origine_Arco",
+]
+TAG_COLUMNS = ["Node_ID", "Main_Tag", "Detailed_Tag"]
+
+
+class CsvLog:
+    def __init__(self, path: str, columns: List[str]) -> None:
+        """
+        File CSV a cui si aggiungono righe in coda, con fsync a ogni scrittura. Se un
+        crash ha lasciato un'ultima riga troncata, viene eliminata prima di scrivere.
+        """
+        self.path = path
+        self.columns = columns
+
+    def header_matches(self) -> bool:
+        """
+        Vero se il file esiste e la sua intestazione corrisponde alle colonne attese.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None) == self.columns
+
+    def append(self, rows: Iterable[Dict[str, Any]], path: str = None) -> int:
+        path = path or self.path
+        rows = list(rows)
+        if not rows:
+            return 0
+        self._repair_tail(path)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(rows)
+
+    def write_tmp(self, rows: Iterable[Dict[str, Any]]) -> Tuple[str, int]:
+        """
+        Scrive `rows` in un file temporaneo accanto al log; replace() lo mette al suo
+        posto, così chi legge non vede mai un file a metà.
+        """
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        count = 0
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction="ignore")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path, count
+
+    def replace(self, tmp_path: str) -> None:
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _repair_tail(path: str) -> None:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            # Riga incompleta: si torna all'ultimo a capo
+            size = f.seek(0, os.SEEK_END)
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+
+class TransactionLog:
+    def __init__(
+        self,
+        state: CrawlState,
+        transactions_path: str,
+        tags_path: str,
+        background: bool = True,
+    ) -> None:
+        """
+        Esporta lo stato del crawling nei CSV delle transazioni e dei tag in modo
+        incrementale (checkpoint) e li compatta periodicamente, in background se
+        `background` è vero.
+
+        Al primo utilizzo su uno stato (o se i CSV mancano o hanno colonne diverse) i
+        file vengono riscritti per intero, poi si procede solo per differenze.
+        """
+        self.state = state
+        self.transactions = CsvLog(transactions_path, TRANSACTION_COLUMNS)
+        self.tags = CsvLog(tags_path, TAG_COLUMNS)
+        self.background = background
+
+        # Community per la mappatura degli archi, aggiornata con i soli tag cambiati
+        self._main_tags, _ = state.tags()
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+        self.edge_cursor = state.get_meta("export_edges_cursor")
+        self.tag_cursor = state.get_meta("export_tags_cursor")
+        self.compacted_rows = state.get_meta("export_compacted_rows", 0)
+        self.appended_rows = state.get_meta("export_appended_rows", 0)
+        if (
+            self.edge_cursor is None
+            or self.tag_cursor is None
+            or not self.transactions.header_matches()
+            or not self.tags.header_matches()
+        ):
+            self.compact(background=False)
+
+    def checkpoint(self) -> Dict[str, int]:
+        """
+        Aggiunge ai CSV gli archi e i tag cambiati dall'ultimo checkpoint e restituisce
+        quante righe sono state scritte.
+        """
+        with self._lock:
+            tag_rows, tag_cursor = self.state.tags_since(self.tag_cursor)
+            for user_id, main_tag, _ in tag_rows:
+                self._main_tags[user_id] = main_tag
+
+            edge_until = self.state.last_edge_rowid()
+            edges = self._with_communities(
+                self.state.iter_edges(after=self.edge_cursor, until=edge_until), self._main_tags
+            )
+            # Prima i file, poi le posizioni: dopo un crash al più si riscrivono
+            # righe già presenti, che la compattazione elimina
+            written_edges = self.transactions.append(edges)
+            written_tags = self.tags.append(
+                {"Node_ID": u, "Main_Tag": m, "Detailed_Tag": d} for u, m, d in tag_rows
+            )
+            self.edge_cursor, self.tag_cursor = edge_until, tag_cursor
+            self.appended_rows += written_edges + written_tags
+            self._save_cursors()
+
+        if self.appended_rows > max(self.compacted_rows, 1000):
+            self.compact(background=self.background)
+        return {"edges": written_edges, "tags": written_tags}
+
+    def compact(self, background: bool = False) -> None:
+        """
+        Riscrive i CSV dallo stato: una riga per arco e per utente, community aggiornate.
+        I checkpoint possono continuare durante la riscrittura: le righe che
+        aggiungono vengono riportate nei nuovi file prima della sostituzione.
+        """
+        if background:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="csv-compaction", daemon=True)
+            self._compactor.start()
+            return
+
+        try:
+            with self._lock:
+                # Si riscrive fino alle posizioni dell'ultimo checkpoint: le righe
+                # successive arriveranno con i prossimi checkpoint
+                if self.edge_cursor is None or self.tag_cursor is None:
+                    self.edge_cursor = self.state.last_edge_rowid()
+                    self.tag_cursor = self.state.last_tag_seq()
+                edge_until, tag_until = self.edge_cursor, self.tag_cursor
+            main_tags, detailed_tags = self.state.tags()
+            tx_tmp, edges = self.transactions.write_tmp(
+                self._with_communities(self.state.iter_edges(until=edge_until), main_tags)
+            )
+            tags_tmp, tags = self.tags.write_tmp(
+                {"Node_ID": u, "Main_Tag": m, "Detailed_Tag": detailed_tags.get(u)}
+                for u, m in main_tags.items()
+            )
+
+            with self._lock:
+                # Righe scritte dai checkpoint durante la riscrittura
+                edges += self.transactions.append(
+                    self._with_communities(
+                        self.state.iter_edges(after=edge_until, until=self.edge_cursor), self._main_tags
+                    ),
+                    path=tx_tmp,
+                )
+                tag_rows, _ = self.state.tags_since(tag_until, until=self.tag_cursor)
+                tags += self.tags.append(
+                    ({"Node_ID": u, "Main_Tag": m, "Detailed_Tag": d} for u, m, d in tag_rows),
+                    path=tags_tmp,
+                )
+                self.transactions.replace(tx_tmp)
+                self.tags.replace(tags_tmp)
+                self.compacted_rows, self.appended_rows = edges + tags, 0
+                self._save_cursors()
+            print(f" Compattazione CSV: {edges} righe di transazioni, {tags} righe di tag.")
+        except Exception as e:
+            print(f"ERRORE durante la compattazione dei CSV: {e}")
+
+    def wait(self) -> None:
+        """
+        Attende la fine di un'eventuale compattazione in background.
+        """
+        if self._compactor is not None:
+            self._compactor.join()
+
+    @staticmethod
+    def _with_communities(edges: Iterable[Dict[str, Any]], main_tags: Dict[int, str]):
+        for edge in edges:
+            edge["Acquirente_Community"] = main_tags.get(edge["Acquirente_ID"], "Sconosciuto")
+            edge["Venditore_Community"] = main_tags.get(edge["Venditore_ID"], "Sconosciuto")
+            yield edge
+
+    def _save_cursors(self) -> None:
+        self.state.set_meta("export_edges_cursor", self.edge_cursor)
+        self.state.set_meta("export_tags_cursor", self.tag_cursor)
+        self.state.set_meta("export_compacted_rows", self.compacted_rows)
+        self.state.set_meta("export_appended_rows", self.appended_rows)
+
+
+def read_transactions(path: str) -> pd.DataFrame:
+    """
+    Legge le transazioni (Parquet o CSV, vedi dataset_io.read_table) tenendo l'ultima
+    riga per (Acquirente, Venditore, Item).
+    """
+    df = read_table(path)
+    return df.drop_duplicates(subset=["Acquirente_ID", "Venditore_ID", "Item_ID"], keep="last")
+
+
+def read_tags(path: str) -> pd.DataFrame:
+    """
+    Legge i tag (Parquet o CSV) tenendo l'ultima riga per Node_ID.
+    """
+    df = read_table(path)
+    return df.drop_duplicates(subset=["Node_ID"], keep="last")
@@ -0,0 +1,4 @@
+from .async_vinted import AsyncVinted
+from .vinted import Vinted
+
+__all__ = ["AsyncVinted", "Vinted"]
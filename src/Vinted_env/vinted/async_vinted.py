@@ -0,0 +1,283 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, List, Literal, Optional
+
+from .models.filters import Catalog, FiltersResponse
+from .models.items import ItemsResponse, UserItemsResponse
+from .models.other import Domain, Language, SortOption
+from .models.search import SearchResponse, SearchSuggestionsResponse, UserSearchResponse
+from .models.users import (
+    UserFeedbacksResponse,
+    UserFeedbacksSummaryResponse,
+    UserResponse,
+)
+from .pagination import apaginate
+from .projection import ProjectedResponse, Projection
+from .vinted import Vinted
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVinted:
+    def __init__(
+        self,
+        domain: Domain = "pl",
+        language: Language = "en-US",
+        proxy: str = None,
+        max_concurrency: int = 4,
+        client: Vinted = None,
+    ) -> None:
+        """
+        Initialize an asyncio counterpart of the Vinted client.
+
+        Requests are still issued by the cloudscraper session of a regular Vinted
+        client (so Cloudflare handling, cookies, endpoints and models are shared), but
+        they run on a dedicated pool of `max_concurrency` threads, so at most that many
+        are in flight at any time. All the requests go to the client's Vinted domain.
+
+        The worker threads share that one client, as run_batch() does: its session
+        manager, rate limiter, proxy pool, cache, feedback store and metrics are
+        guarded by their own locks, the log sampling counter is an atomic
+        itertools.count, and the cloudscraper session's connection pools and cookie
+        jar lock themselves. A client passed in can keep being used from other threads.
+
+        Args:
+            domain: Vinted domain to use (e.g., "pl", "com", "fr")
+            language: Language for API responses (e.g., "en-US", "pl-PL")
+            proxy: Optional proxy URL for requests
+            max_concurrency: Maximum number of concurrent requests
+            client: Optional already configured Vinted client to wrap
+
+        Example:
+            async with AsyncVinted(domain="it", max_concurrency=8) as vinted:
+                users = await asyncio.gather(*(vinted.user_info(i) for i in ids))
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        logger.info(
+            "Initializing AsyncVinted client with max_concurrency: %s",
+            max_concurrency,
+        )
+        self.client = client or Vinted(domain=domain, language=language, proxy=proxy)
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.client.resize_connection_pool(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncVinted":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Wait for the in-flight requests to finish and release the worker threads. A
+        later request starts a new pool.
+        """
+        logger.debug("Shutting down AsyncVinted executor")
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        # Created on first use (and after close()); only touched from the event loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="vinted"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def search(
+        self,
+        url: str = None,
+        page: int = 1,
+        per_page: int = 96,
+        query: str = None,
+        price_from: float = None,
+        price_to: float = None,
+        order: SortOption = "newest_first",
+        catalog_ids: int | List[int] = None,
+        size_ids: int | List[int] = None,
+        brand_ids: int | List[int] = None,
+        status_ids: int | List[int] = None,
+        color_ids: int | List[int] = None,
+        patterns_ids: int | List[int] = None,
+        material_ids: int | List[int] = None,
+        video_game_platform_ids: int | List[int] = None,
+        country_ids: str | List[str] = None,
+        projection: Projection = None,
+        raw: bool = False,
+    ) -> SearchResponse | ProjectedResponse | dict:
+        return await self._run(
+            self.client.search,
+            url=url,
+            page=page,
+            per_page=per_page,
+            query=query,
+            price_from=price_from,
+            price_to=price_to,
+            order=order,
+            catalog_ids=catalog_ids,
+            size_ids=size_ids,
+            brand_ids=brand_ids,
+            status_ids=status_ids,
+            color_ids=color_ids,
+            patterns_ids=patterns_ids,
+            material_ids=material_ids,
+            video_game_platform_ids=video_game_platform_ids,
+            country_ids=country_ids,
+            projection=projection,
+            raw=raw,
+        )
+
+    def iter_search(
+        self,
+        max_pages: int = None,
+        per_page: int = 96,
+        prefetch: bool = True,
+        projection: Projection = None,
+        **search_kwargs,
+    ) -> AsyncIterator:
+        """
+        Async iterator over the items of consecutive search result pages, see
+        Vinted.iter_search().
+
+        Example:
+            async for item in vinted.iter_search(query="nike", max_pages=5):
+                ...
+        """
+        start_page = search_kwargs.pop("page", 1)
+        return apaginate(
+            lambda page: self.search(
+                page=page, per_page=per_page, projection=projection, **search_kwargs
+            ),
+            "items",
+            start_page=start_page,
+            max_pages=max_pages,
+            prefetch=prefetch,
+        )
+
+    async def search_users(
+        self, query: str, page: int = 1, per_page: int = 36
+    ) -> UserSearchResponse:
+        return await self._run(
+            self.client.search_users,
+            query=query,
+            page=page,
+            per_page=per_page,
+        )
+
+    async def item_info(self, item_id: int) -> ItemsResponse:
+        return await self._run(self.client.item_info, item_id)
+
+    async def user_info(self, user_id: int, localize: bool = False) -> UserResponse:
+        return await self._run(self.client.user_info, user_id, localize=localize)
+
+    async def user_items(
+        self,
+        user_id: int,
+        page: int = 1,
+        per_page: int = 96,
+        order: SortOption = "newest_first",
+        projection: Projection = None,
+        raw: bool = False,
+    ) -> UserItemsResponse | ProjectedResponse | dict:
+        return await self._run(
+            self.client.user_items,
+            user_id,
+            page=page,
+            per_page=per_page,
+            order=order,
+            projection=projection,
+            raw=raw,
+        )
+
+    def iter_user_items(
+        self,
+        user_id: int,
+        per_page: int = 96,
+        order: SortOption = "newest_first",
+        max_pages: int = None,
+        prefetch: bool = True,
+        projection: Projection = None,
+    ) -> AsyncIterator:
+        return apaginate(
+            lambda page: self.user_items(
+                user_id, page=page, per_page=per_page, order=order, projection=projection
+            ),
+            "items",
+            max_pages=max_pages,
+            prefetch=prefetch,
+        )
+
+    async def user_feedbacks(
+        self,
+        user_id: int,
+        page: int = 1,
+        per_page: int = 20,
+        by: Literal["all", "user", "system"] = "all",
+        projection: Projection = None,
+        raw: bool = False,
+    ) -> UserFeedbacksResponse | ProjectedResponse | dict:
+        return await self._run(
+            self.client.user_feedbacks,
+            user_id,
+            page=page,
+            per_page=per_page,
+            by=by,
+            projection=projection,
+            raw=raw,
+        )
+
+    def iter_user_feedbacks(
+        self,
+        user_id: int,
+        per_page: int = 20,
+        by: Literal["all", "user", "system"] = "all",
+        max_pages: int = None,
+        prefetch: bool = True,
+        projection: Projection = None,
+    ) -> AsyncIterator:
+        return apaginate(
+            lambda page: self.user_feedbacks(
+                user_id, page=page, per_page=per_page, by=by, projection=projection
+            ),
+            "user_feedbacks",
+            max_pages=max_pages,
+            prefetch=prefetch,
+        )
+
+    async def user_feedbacks_summary(
+        self, user_id: int
+    ) -> UserFeedbacksSummaryResponse:
+        return await self._run(self.client.user_feedbacks_summary, user_id)
+
+    async def search_suggestions(self, query: str) -> SearchSuggestionsResponse:
+        return await self._run(self.client.search_suggestions, query)
+
+    async def catalog_filters(
+        self,
+        query: str = None,
+        catalog_ids: int = None,
+        brand_ids: int | List[int] = None,
+        status_ids: int | List[int] = None,
+        color_ids: int | List[int] = None,
+    ) -> FiltersResponse:
+        return await self._run(
+            self.client.catalog_filters,
+            query=query,
+            catalog_ids=catalog_ids,
+            brand_ids=brand_ids,
+            status_ids=status_ids,
+            color_ids=color_ids,
+        )
+
+    async def catalogs_list(self) -> List[Catalog]:
+        return await self._run(self.client.catalogs_list)
+
+    async def fetch_offer_description(self, url: str) -> str:
+        return await self._run(self.client.fetch_offer_description, url)
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from requests import ConnectionError, HTTPError, Timeout
+
+from .exceptions import RateLimitExceededException
+
+logger = logging.getLogger(__name__)
+
+# Server side hiccups worth another attempt; 401/403/404 are left to the caller
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_attempts = threading.local()
+
+
+@dataclass(slots=True)
+class BatchResult:
+    key: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Return whether a failed request is worth retrying.
+    """
+    if isinstance(error, (RateLimitExceededException, ConnectionError, Timeout)):
+        return True
+    if isinstance(error, HTTPError) and error.response is not None:
+        return error.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def in_retry() -> bool:
+    """
+    Return whether the current thread is running a retry of a batch key, so the
+    requests it sends can be counted as retries.
+    """
+    return getattr(_attempts, "retry", False)
+
+
+def retry_call(
+    func: Callable[[Any], Any], key, retries: int = 2, backoff: float = 1.0
+) -> BatchResult:
+    """
+    Call `func(key)`, retrying transient errors (see is_transient) up to `retries`
+    times with exponential backoff starting at `backoff` seconds. The outcome is
+    returned as a BatchResult instead of raised.
+    """
+    for attempt in range(retries + 1):
+        _attempts.retry = attempt > 0
+        try:
+            return BatchResult(key=key, value=func(key), attempts=attempt + 1)
+        except Exception as e:
+            if attempt == retries or not is_transient(e):
+                return BatchResult(key=key, error=e, attempts=attempt + 1)
+            delay = backoff * 2**attempt
+            logger.info(
+                "Transient error for %r: %s, retrying in %.1fs (%s/%s)",
+                key,
+                e,
+                delay,
+                attempt + 1,
+                retries,
+            )
+            time.sleep(delay)
+        finally:
+            _attempts.retry = False
+
+
+def run_batch(
+    func: Callable[[Any], Any],
+    keys: Iterable,
+    max_workers: int = 4,
+    retries: int = 2,
+    backoff: float = 1.0,
+) -> Iterator[BatchResult]:
+    """
+    Call `func(key)` for every key on a thread pool and yield a BatchResult per key
+    as soon as it completes (not in input order).
+
+    At most `max_workers` keys are in flight at any time and `keys` is consumed
+    lazily, so arbitrarily long (or generated) inputs are fine. Exceptions are
+    captured in the result instead of aborting the batch; transient ones (see
+    is_transient) are retried up to `retries` times with exponential backoff.
+    Closing the iterator early cancels the keys not started yet.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vinted-batch")
+    pending: Dict[Future, Any] = {}
+    try:
+        for key in keys:
+            if len(pending) >= max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    yield future.result()
+            pending[executor.submit(retry_call, func, key, retries, backoff)] = key
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,190 @@
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Union
+from urllib.parse import urlencode
+
+from .endpoints import Endpoints
+
+logger = logging.getLogger(__name__)
+
+# Time to live in seconds for each endpoint, a value <= 0 disables caching. Besides the
+# API endpoints, "offer_page" holds the descriptions extracted from item pages.
+DEFAULT_TTLS: Dict[Union[Endpoints, str], float] = {
+    Endpoints.CATALOG_ITEMS: 10 * 60,
+    Endpoints.CATALOG_FILTERS: 7 * 24 * 3600,
+    Endpoints.CATALOG_INITIALIZERS: 7 * 24 * 3600,
+    Endpoints.ITEMS: 24 * 3600,
+    Endpoints.USERS: 3600,
+    Endpoints.USER: 24 * 3600,
+    Endpoints.USER_FEEDBACKS: 24 * 3600,
+    Endpoints.USER_ITEMS: 6 * 3600,
+    Endpoints.USER_FEEDBACKS_SUMMARY: 24 * 3600,
+    Endpoints.SEARCH_SUGGESTIONS: 24 * 3600,
+    "offer_page": 7 * 24 * 3600,
+}
+
+# Parameters that change on every call without changing the response
+VOLATILE_PARAMS = {"time"}
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = "vinted_cache.sqlite",
+        ttls: Dict[Union[Endpoints, str], float] = None,
+        default_ttl: float = 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        """
+        Persistent cache of raw API responses, consulted by Vinted._get before going
+        to the network.
+
+        Entries are keyed by the client's API URL (so its domain) and language, the
+        endpoint, path values and normalized query parameters (sorted, None turned
+        into "", volatile parameters like `time` dropped), so clients of different
+        domains or languages can share one file without mixing their responses.
+        Bodies are stored zlib-compressed in a SQLite database, so the cache survives
+        restarts and can be shared by several processes. When the stored size exceeds
+        `max_bytes` the least recently used entries are evicted.
+
+        Args:
+            path: SQLite database file
+            ttls: Time to live in seconds per endpoint, merged over DEFAULT_TTLS
+            default_ttl: Time to live for endpoints missing from `ttls`
+            max_bytes: Upper bound for the compressed size of the stored bodies
+
+        Example:
+            vinted = Vinted(domain="it", cache=ResponseCache("cache.sqlite"))
+        """
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        logger.info(
+            "Response cache opened: %s, %.2f KB stored",
+            path,
+            self._size / 1024,
+        )
+
+    @staticmethod
+    def make_key(
+        endpoint: Endpoints,
+        format_values=None,
+        params: dict = None,
+        api_url: str = "",
+        language: str = "",
+    ) -> str:
+        normalized = sorted(
+            (k, "" if v is None else str(v))
+            for k, v in (params or {}).items()
+            if k not in VOLATILE_PARAMS
+        )
+        path = endpoint.value.format(format_values) if format_values else endpoint.value
+        return f"{language}:{api_url}{path}?{urlencode(normalized)}"
+
+    def ttl_for(self, endpoint: Union[Endpoints, str]) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint: Union[Endpoints, str], key: str) -> Optional[bytes]:
+        """
+        Return the cached body for `key`, or None if it is missing or expired.
+        """
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            body, stored_at = row
+            if now - stored_at > ttl:
+                logger.debug("Cache entry expired: %s", key)
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        logger.debug("Cache hit: %s", key)
+        return zlib.decompress(body)
+
+    def set(self, endpoint: Union[Endpoints, str], key: str, body: bytes) -> None:
+        if self.ttl_for(endpoint) <= 0:
+            return
+        compressed = zlib.compress(body)
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, getattr(endpoint, "name", endpoint), compressed, len(compressed), now, now),
+            )
+            self._size += len(compressed) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Free down to 90% of the budget so that eviction does not run on every insert
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info("Response cache evicted %s entries", len(evicted))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._size -= row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
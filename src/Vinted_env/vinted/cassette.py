@@ -0,0 +1,145 @@
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Literal, Union
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import CassetteMissException
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that differ between recording and replay without changing the response
+VOLATILE_PARAMS = {"time"}
+
+
+def _request_key(method: str, url: str) -> str:
+    parsed = urlparse(url)
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k not in VOLATILE_PARAMS
+    )
+    return f"{method.upper()} {urlunparse(parsed._replace(query=urlencode(query)))}"
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: str,
+        mode: Literal["record", "replay"] = "replay",
+        latency: Union[float, Literal["recorded"], None] = None,
+    ) -> None:
+        """
+        Record raw HTTP exchanges to a gzip-compressed JSON lines file and serve them
+        back later, so the crawl pipeline can be run and benchmarked offline.
+
+        The cassette wraps the scraper session of a Vinted client, therefore both the
+        client methods and direct `vinted.scraper.get(...)` calls are captured.
+        Requests are matched on method and URL, ignoring volatile query parameters
+        such as `time`. Repeated identical requests are replayed in recording order,
+        the last recorded response being reused once the sequence is exhausted.
+
+        Args:
+            path: Cassette file (e.g. "crawl.jsonl.gz")
+            mode: "record" appends every exchange to the file, "replay" serves them back
+            latency: Simulated latency on replay, a fixed number of seconds or
+                "recorded" to reproduce the latency measured while recording
+
+        Example:
+            vinted = Vinted(domain="it", cassette=Cassette("crawl.jsonl.gz", mode="record"))
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._episodes: Dict[str, Deque[dict]] = defaultdict(deque)
+        self._last: Dict[str, dict] = {}
+
+        if mode == "replay":
+            self._load()
+        logger.info("Cassette %s opened in %s mode", path, mode)
+
+    def _load(self) -> None:
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                episode = json.loads(line)
+                self._episodes[episode["key"]].append(episode)
+                count += 1
+        logger.info("Loaded %s recorded responses from %s", count, self.path)
+
+    def wrap(self, session) -> "CassetteSession":
+        return CassetteSession(self, session)
+
+    def record(self, method: str, url: str, response: Response, elapsed: float) -> None:
+        episode = {
+            "key": _request_key(method, url),
+            "url": response.url or url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed": elapsed,
+        }
+        line = json.dumps(episode) + "\n"
+        with self._lock:
+            # Every line is its own gzip member, so an interrupted run leaves a valid file
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    def replay(self, method: str, url: str) -> Response:
+        key = _request_key(method, url)
+        with self._lock:
+            queue = self._episodes.get(key)
+            if queue:
+                episode = queue.popleft()
+                self._last[key] = episode
+            elif key in self._last:
+                episode = self._last[key]
+            else:
+                raise CassetteMissException(f"No recorded response for: {key}")
+
+        delay = episode["elapsed"] if self.latency == "recorded" else self.latency
+        if delay:
+            time.sleep(delay)
+
+        response = Response()
+        response.status_code = episode["status"]
+        response.headers = CaseInsensitiveDict(episode["headers"])
+        response._content = base64.b64decode(episode["body"])
+        response.url = episode["url"]
+        response.encoding = "utf-8"
+        return response
+
+
+class CassetteSession:
+    def __init__(self, cassette: Cassette, session) -> None:
+        self.cassette = cassette
+        self.session = session
+
+    def __getattr__(self, name):
+        # Anything not intercepted (adapters, cookies, mount...) is the real session's
+        return getattr(self.session, name)
+
+    def request(self, method: str, url: str, *args, **kwargs) -> Response:
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(method, url)
+
+        start = time.monotonic()
+        response = self.session.request(method, url, *args, **kwargs)
+        self.cassette.record(method, url, response, time.monotonic() - start)
+        return response
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("get", url, **kwargs)
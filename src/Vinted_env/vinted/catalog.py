@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Set
+
+from .models.filters import Catalog, FilterOption, FiltersResponse
+from .utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CatalogNode:
+    id: int
+    title: str
+    code: str
+    parent_id: Optional[int]
+    depth: int
+    item_count: int
+    url: str
+    children: List[int] = field(default_factory=list)
+
+    @property
+    def is_leaf(self) -> bool:
+        return not self.children
+
+
+@dataclass(slots=True)
+class CatalogIndexUpdate:
+    added: Set[int] = field(default_factory=set)
+    removed: Set[int] = field(default_factory=set)
+    changed: Set[int] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _flatten_options(options: Optional[List[FilterOption]]) -> Dict[int, str]:
+    flat = {}
+    stack = list(options or [])
+    while stack:
+        option = stack.pop()
+        if option.type != "group":
+            flat[option.id] = option.title
+        stack.extend(option.options or [])
+    return flat
+
+
+class CatalogIndex:
+    def __init__(self, path: str = None, max_age: float = 7 * 24 * 3600) -> None:
+        """
+        In-memory index of the catalog tree of one Vinted domain, optionally persisted
+        as JSON so that it is downloaded once and reused by later runs.
+
+        The nested Catalog models returned by Vinted.catalogs_list() are flattened
+        into id -> CatalogNode, with precomputed ancestor chains and descendant sets
+        plus code and title lookups, so hierarchy questions (is this catalog under
+        "Donna"? which leaves make up "Scarpe"?) are dictionary lookups. The filter
+        options of a catalog (catalog_filters()) are added on demand and persisted too.
+
+        Args:
+            path: Optional JSON file holding the index, one file per Vinted domain
+            max_age: Seconds after which the tree is considered stale
+
+        Example:
+            index = vinted.catalog_index("vinted_catalogs_it.json")
+            index.ancestors(index.find("WOMEN_SHOES").id)
+        """
+        self.path = path
+        self.max_age = max_age
+        self.built_at = 0.0
+
+        self.nodes: Dict[int, CatalogNode] = {}
+        self._by_code: Dict[str, int] = {}
+        self._by_title: Dict[str, List[int]] = {}
+        self._descendants: Dict[int, FrozenSet[int]] = {}
+        # catalog id -> filter code -> option id -> option title
+        self._filters: Dict[int, Dict[str, Dict[int, str]]] = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, catalog_id: int) -> bool:
+        return catalog_id in self.nodes
+
+    def __iter__(self) -> Iterator[CatalogNode]:
+        return iter(self.nodes.values())
+
+    def is_fresh(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        return bool(self.nodes) and now - self.built_at < self.max_age
+
+    def get(self, catalog_id: int) -> Optional[CatalogNode]:
+        return self.nodes.get(catalog_id)
+
+    def find(self, code: str) -> Optional[CatalogNode]:
+        """
+        Return the catalog with the given code (e.g. "WOMEN_SHOES").
+        """
+        catalog_id = self._by_code.get(code.upper())
+        return None if catalog_id is None else self.nodes[catalog_id]
+
+    def find_title(self, title: str) -> List[CatalogNode]:
+        """
+        Return the catalogs with the given title, case insensitive. Titles are not
+        unique ("Altro" appears under many parents).
+        """
+        return [self.nodes[i] for i in self._by_title.get(title.casefold(), [])]
+
+    @property
+    def roots(self) -> List[CatalogNode]:
+        return [node for node in self.nodes.values() if node.parent_id is None]
+
+    def parent(self, catalog_id: int) -> Optional[CatalogNode]:
+        parent_id = self.nodes[catalog_id].parent_id
+        return None if parent_id is None else self.nodes[parent_id]
+
+    def ancestors(self, catalog_id: int) -> List[CatalogNode]:
+        """
+        Return the chain of ancestors of a catalog, from its parent up to the root.
+        """
+        chain = []
+        parent_id = self.nodes[catalog_id].parent_id
+        while parent_id is not None:
+            node = self.nodes[parent_id]
+            chain.append(node)
+            parent_id = node.parent_id
+        return chain
+
+    def path_titles(self, catalog_id: int, separator: str = " > ") -> str:
+        """
+        Return the breadcrumb of a catalog, e.g. "Donna > Scarpe > Sneakers".
+        """
+        chain = [self.nodes[catalog_id], *self.ancestors(catalog_id)]
+        return separator.join(node.title for node in reversed(chain))
+
+    def root_of(self, catalog_id: int) -> CatalogNode:
+        chain = self.ancestors(catalog_id)
+        return chain[-1] if chain else self.nodes[catalog_id]
+
+    def children(self, catalog_id: int) -> List[CatalogNode]:
+        return [self.nodes[i] for i in self.nodes[catalog_id].children]
+
+    def descendants(self, catalog_id: int) -> FrozenSet[int]:
+        """
+        Return the ids of every catalog below `catalog_id`, itself excluded.
+        """
+        return self._descendants[catalog_id]
+
+    def is_descendant(self, catalog_id: int, ancestor_id: int) -> bool:
+        return catalog_id in self._descendants.get(ancestor_id, ())
+
+    def leaves(self, catalog_id: int) -> List[CatalogNode]:
+        """
+        Return the leaf catalogs below `catalog_id`, or the catalog itself if it is
+        a leaf.
+        """
+        node = self.nodes[catalog_id]
+        if node.is_leaf:
+            return [node]
+        return [self.nodes[i] for i in self._descendants[catalog_id] if self.nodes[i].is_leaf]
+
+    def update(self, catalogs: List[Catalog]) -> CatalogIndexUpdate:
+        """
+        Rebuild the tree from a fresh catalogs_list() and return which catalogs were
+        added, removed or changed (title, code, parent or item count). The filter
+        options of removed or moved catalogs are dropped, the others are kept.
+        """
+        nodes = {}
+        stack = [(catalog, None, 0) for catalog in reversed(catalogs)]
+        while stack:
+            catalog, parent_id, depth = stack.pop()
+            nodes[catalog.id] = CatalogNode(
+                id=catalog.id,
+                title=catalog.title,
+                code=catalog.code,
+                parent_id=parent_id,
+                depth=depth,
+                item_count=catalog.item_count,
+                url=catalog.url,
+                children=[child.id for child in catalog.catalogs or []],
+            )
+            stack.extend(
+                (child, catalog.id, depth + 1) for child in reversed(catalog.catalogs or [])
+            )
+
+        with self._lock:
+            diff = CatalogIndexUpdate(
+                added=nodes.keys() - self.nodes.keys(),
+                removed=self.nodes.keys() - nodes.keys(),
+                changed={
+                    i
+                    for i in nodes.keys() & self.nodes.keys()
+                    if nodes[i] != self.nodes[i]
+                },
+            )
+            for catalog_id in diff.removed | {
+                i for i in diff.changed if nodes[i].parent_id != self.nodes[i].parent_id
+            }:
+                self._filters.pop(catalog_id, None)
+            self._set_nodes(nodes)
+            self.built_at = time.time()
+        logger.info(
+            "Catalog index updated: %s catalogs, %s added, %s removed, %s changed",
+            len(nodes),
+            len(diff.added),
+            len(diff.removed),
+            len(diff.changed),
+        )
+        if self.path is not None:
+            self.save()
+        return diff
+
+    def filter_options(
+        self,
+        catalog_id: int,
+        fetch: Callable[[int], FiltersResponse] = None,
+    ) -> Dict[str, Dict[int, str]]:
+        """
+        Return the filter options available in a catalog as {filter code: {option id:
+        option title}}, e.g. {"size": {206: "M", ...}, "brand": {...}}. When they are
+        not indexed yet they are obtained with `fetch(catalog_id)` (typically
+        Vinted.catalog_filters) and stored.
+        """
+        filters = self._filters.get(catalog_id)
+        if filters is not None or fetch is None:
+            return filters or {}
+        response = fetch(catalog_id)
+        filters = {
+            f.code: _flatten_options(f.options)
+            for f in getattr(response, "filters", None) or []
+        }
+        with self._lock:
+            self._filters[catalog_id] = filters
+        if self.path is not None:
+            self.save()
+        return filters
+
+    def save(self) -> None:
+        with self._lock:
+            state = {
+                "built_at": self.built_at,
+                "nodes": [asdict(node) for node in self.nodes.values()],
+                "filters": {
+                    str(catalog_id): {
+                        code: {str(i): title for i, title in options.items()}
+                        for code, options in filters.items()
+                    }
+                    for catalog_id, filters in self._filters.items()
+                },
+            }
+        with atomic_write(self.path) as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def load(self) -> bool:
+        if self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable catalog index %s: %s", self.path, e)
+            return False
+        with self._lock:
+            self._set_nodes({n["id"]: CatalogNode(**n) for n in state["nodes"]})
+            self._filters = {
+                int(catalog_id): {
+                    code: {int(i): title for i, title in options.items()}
+                    for code, options in filters.items()
+                }
+                for catalog_id, filters in state.get("filters", {}).items()
+            }
+            self.built_at = state["built_at"]
+        logger.debug("Loaded %s catalogs from %s", len(self.nodes), self.path)
+        return True
+
+    def _set_nodes(self, nodes: Dict[int, CatalogNode]) -> None:
+        self.nodes = nodes
+        self._by_code = {node.code.upper(): node.id for node in nodes.values() if node.code}
+        self._by_title = {}
+        for node in nodes.values():
+            self._by_title.setdefault(node.title.casefold(), []).append(node.id)
+
+        # Children always come after their parent in `nodes`, so walking it backwards
+        # completes every subtree before its parent needs it
+        descendants: Dict[int, FrozenSet[int]] = {}
+        for node in reversed(list(nodes.values())):
+            below = set(node.children)
+            for child_id in node.children:
+                below |= descendants[child_id]
+            descendants[node.id] = frozenset(below)
+        self._descendants = descendants
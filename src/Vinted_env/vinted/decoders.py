@@ -0,0 +1,216 @@
+import sys
+import threading
+from collections.abc import Mapping
+from dataclasses import MISSING, fields, is_dataclass
+from types import UnionType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from .exceptions import DecodeError
+
+T = TypeVar("T")
+
+# Low-cardinality string fields repeated across thousands of records (currencies,
+# item statuses, countries, thumbnail types...). Their values are interned while
+# decoding so that all model instances share a single copy of each distinct string.
+INTERNED_FIELDS = frozenset(
+    {
+        "buyer_currency",
+        "city",
+        "content_source",
+        "country_code",
+        "country_iso_code",
+        "country_title",
+        "country_title_local",
+        "currency",
+        "currency_code",
+        "display_type",
+        "locale",
+        "selection_type",
+        "seller_currency",
+        "size_title",
+        "status",
+        "type",
+    }
+)
+
+_DECODERS: Dict[type, Callable[[Any], Any]] = {}
+# Decoders being compiled by the thread holding _LOCK, published to _DECODERS only
+# once every nested decoder they reference is bound
+_COMPILING: Dict[type, Callable[[Any], Any]] = {}
+_LOCK = threading.RLock()
+
+
+def decode(data_class: Type[T], data: Any) -> T:
+    """
+    Build an instance of `data_class` from decoded JSON data.
+
+    Drop-in replacement for `dacite.from_dict(data_class, data)` with the same rules
+    for missing values (defaults, then None for Optional fields, else an error), but
+    without runtime type checks, backed by a converter compiled once per dataclass.
+
+    Raises:
+        DecodeError: If a required field is missing or the data has the wrong shape.
+    """
+    return compile_decoder(data_class)(data)
+
+
+def compile_decoder(data_class: Type[T]) -> Callable[[Any], T]:
+    """
+    Return the converter for `data_class`, generating and caching it on first use.
+    """
+    decoder = _DECODERS.get(data_class)
+    if decoder is None:
+        with _LOCK:
+            decoder = _DECODERS.get(data_class) or _COMPILING.get(data_class)
+            if decoder is None:
+                outermost = not _COMPILING
+                try:
+                    decoder = _compile(data_class)
+                    if outermost:
+                        _DECODERS.update(_COMPILING)
+                finally:
+                    if outermost:
+                        _COMPILING.clear()
+    return decoder
+
+
+def _intern(value):
+    return sys.intern(value) if value.__class__ is str else value
+
+
+def _unwrap_optional(type_) -> Tuple[bool, Any]:
+    if get_origin(type_) in (Union, UnionType):
+        args = get_args(type_)
+        if type(None) in args:
+            rest = tuple(a for a in args if a is not type(None))
+            return True, rest[0] if len(rest) == 1 else Union[rest]
+    return False, type_
+
+
+def _union_converter(members: List[type]) -> Callable[[Any], Any]:
+    def convert(value):
+        if isinstance(value, Mapping):
+            for member in members:
+                try:
+                    return compile_decoder(member)(value)
+                except DecodeError:
+                    continue
+        return value
+
+    return convert
+
+
+def _converter_template(type_, namespace: dict, nested: list, depth: int = 0) -> Optional[str]:
+    """
+    Return a source template converting the value `{}` to `type_`, or None when the
+    value can be used as is.
+    """
+    if is_dataclass(type_):
+        name = f"decode_{type_.__module__.replace('.', '_')}_{type_.__name__}"
+        nested.append((name, type_))
+        return f"{name}({{}})"
+
+    origin = get_origin(type_)
+    if origin in (list, List):
+        args = get_args(type_)
+        if not args:
+            return None
+        optional, item_type = _unwrap_optional(args[0])
+        item = _converter_template(item_type, namespace, nested, depth + 1)
+        if item is None:
+            return None
+        var = f"x{depth}"
+        if optional:
+            return f"[None if {var} is None else {item.format(var)} for {var} in {{}}]"
+        return f"[{item.format(var)} for {var} in {{}}]"
+
+    if origin in (Union, UnionType):
+        members = [a for a in get_args(type_) if is_dataclass(a)]
+        if not members:
+            return None
+        name = f"union_{len(namespace)}"
+        namespace[name] = _union_converter(members)
+        return f"{name}({{}})"
+
+    return None
+
+
+def _compile(data_class: type) -> Callable[[Any], Any]:
+    if not is_dataclass(data_class):
+        raise TypeError(f"{data_class!r} is not a dataclass")
+
+    hints = get_type_hints(data_class)
+    namespace = {
+        "data_class": data_class,
+        "DecodeError": DecodeError,
+        "Mapping": Mapping,
+        "intern": _intern,
+    }
+    nested: List[Tuple[str, type]] = []
+    arguments = []
+
+    for index, field in enumerate(fields(data_class)):
+        if not field.init:
+            continue
+        key = repr(field.name)
+        optional, type_ = _unwrap_optional(hints[field.name])
+
+        if field.default is not MISSING:
+            namespace[f"default_{index}"] = field.default
+            access = f"data.get({key}, default_{index})"
+        elif field.default_factory is not MISSING:
+            namespace[f"factory_{index}"] = field.default_factory
+            access = f"(data[{key}] if {key} in data else factory_{index}())"
+        elif optional:
+            access = f"data.get({key})"
+        else:
+            access = f"data[{key}]"
+
+        template = _converter_template(type_, namespace, nested)
+        if template is None and field.name in INTERNED_FIELDS:
+            arguments.append(f"intern({access})")
+        elif template is None:
+            arguments.append(access)
+        elif optional or field.default is not MISSING:
+            arguments.append(f"(None if (v{index} := {access}) is None else {template.format(f'v{index}')})")
+        else:
+            arguments.append(template.format(access))
+
+    name = f"decode_{data_class.__module__.replace('.', '_')}_{data_class.__name__}"
+    source = "\n".join(
+        [
+            f"def {name}(data):",
+            "    try:",
+            f"        return data_class({', '.join(arguments)})",
+            "    except KeyError as e:",
+            f"        raise DecodeError(f'missing value for field {{e.args[0]!r}} in {data_class.__name__}') from None",
+            "    except (TypeError, AttributeError) as e:",
+            "        if not isinstance(data, Mapping):",
+            f"            raise DecodeError(f'expected a mapping for {data_class.__name__}, got {{type(data).__name__}}') from None",
+            f"        raise DecodeError(f'invalid data for {data_class.__name__}: {{e}}') from e",
+        ]
+    )
+    exec(compile(source, f"<decoder {data_class.__qualname__}>", "exec"), namespace)
+    decoder = namespace[name]
+
+    # Registered as in progress before resolving the nested decoders so self-referencing
+    # models (Catalog.catalogs, FilterOption.options) find it instead of recursing
+    # forever; other threads only see it in _DECODERS once the outermost compilation
+    # has bound all the names
+    _COMPILING[data_class] = decoder
+    for nested_name, nested_class in nested:
+        namespace[nested_name] = compile_decoder(nested_class)
+    return decoder
@@ -0,0 +1,103 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Start of the <div itemprop="description"> element, located with a plain regex search
+# so that only the fragment from there on goes through the HTML parser
+DESCRIPTION_START = re.compile(
+    r"""<div\b[^>]*\bitemprop\s*=\s*["']?description\b""", re.IGNORECASE
+)
+
+# Elements whose content is not text, skipped like BeautifulSoup.get_text() does
+NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+VOID_TAGS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class DescriptionParser(HTMLParser):
+    def __init__(self) -> None:
+        """
+        Collect the text of the first <div itemprop="description"> and stop as soon
+        as that element is closed.
+
+        Open elements are tracked on a stack the way BeautifulSoup's html.parser
+        builder does: an end tag closes the innermost open element with that name,
+        together with anything left unclosed inside it (an unclosed <p> or <li>
+        does not keep the description open), and an end tag matching no open
+        element is ignored.
+        """
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.found = False
+        self.done = False
+        self._open: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs) -> None:
+        if not self.found:
+            if tag == "div" and ("itemprop", "description") in attrs:
+                self.found = True
+                self._open.append(tag)
+            return
+        if tag in VOID_TAGS:
+            return
+        self._open.append(tag)
+        if tag in NON_TEXT_TAGS:
+            self._skip += 1
+
+    def handle_startendtag(self, tag, attrs) -> None:
+        if not self.found and tag == "div" and ("itemprop", "description") in attrs:
+            self.found = True
+            self._finish()
+
+    def handle_endtag(self, tag) -> None:
+        if not self.found or tag not in self._open:
+            return
+        while True:
+            closed = self._open.pop()
+            if closed in NON_TEXT_TAGS:
+                self._skip -= 1
+            if closed == tag:
+                break
+        if not self._open:
+            self._finish()
+
+    def handle_data(self, data) -> None:
+        if self.found and not self._skip:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+
+    def _finish(self) -> None:
+        self.done = True
+        raise _StopParsing
+
+    @property
+    def text(self) -> Optional[str]:
+        return "".join(self.parts) if self.found else None
+
+
+def extract_description(html: str) -> Optional[str]:
+    """
+    Return the text of the <div itemprop="description"> of an item page, stripped
+    and joined like BeautifulSoup's get_text(strip=True), or None if the page has none.
+
+    Instead of building a tree of the whole page, the element is located with a regex
+    and only the fragment from there to its closing tag is parsed.
+    """
+    match = DESCRIPTION_START.search(html)
+    if match is None:
+        return None
+    parser = DescriptionParser()
+    try:
+        parser.feed(html[match.start():])
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.text
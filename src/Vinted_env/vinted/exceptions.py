@@ -3,4 +3,16 @@ class InvalidUrlException(Exception):
 
 
 class RateLimitExceededException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class NoProxyAvailableException(Exception):
+    pass
+
+
+class CassetteMissException(Exception):
+    pass
+
+
+class DecodeError(Exception):
+    pass
@@ -0,0 +1,248 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Optional
+
+from .models.base import Pagination
+from .projection import Projection, ProjectedResponse
+
+logger = logging.getLogger(__name__)
+
+# Feedback fields kept by the store, enough for building the graph, tagging users
+# and resolving counter reviews
+STORED_FEEDBACK_FIELDS = (
+    "id",
+    "feedback_user_id",
+    "user_id",
+    "rating",
+    "item_id",
+    "item_title",
+    "created_at_ts",
+    "system_feedback",
+)
+
+StoredFeedback = namedtuple("StoredFeedback", STORED_FEEDBACK_FIELDS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    user_id INTEGER NOT NULL,
+    per_page INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    current_page INTEGER,
+    total_pages INTEGER,
+    total_entries INTEGER,
+    time INTEGER,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (user_id, per_page, page)
+);
+CREATE TABLE IF NOT EXISTS feedbacks (
+    user_id INTEGER NOT NULL,
+    per_page INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    id INTEGER,
+    feedback_user_id INTEGER,
+    rating INTEGER,
+    item_id INTEGER,
+    item_title TEXT,
+    created_at_ts TEXT,
+    system_feedback INTEGER,
+    PRIMARY KEY (user_id, per_page, page, position)
+);
+CREATE INDEX IF NOT EXISTS feedbacks_author ON feedbacks (user_id, feedback_user_id);
+"""
+
+
+class FeedbackStore:
+    def __init__(
+        self, path: str = "vinted_feedbacks.sqlite", max_age: float = 7 * 24 * 3600
+    ) -> None:
+        """
+        Persistent store of the fetched /user_feedbacks pages, keyed by
+        (user_id, per_page, page), shared by every process opening the same file.
+
+        Each page keeps the STORED_FEEDBACK_FIELDS of its feedbacks, its pagination
+        and the time it was fetched. Vinted.user_feedbacks() serves a page from the
+        store while it is younger than `max_age` and otherwise fetches and stores it,
+        so a page downloaded by one stage (crawling, tagging) is not requested again
+        by the next one (counter reviews). Each stage can open the store with its own
+        `max_age`.
+
+        Only requests whose projection is a subset of STORED_FEEDBACK_FIELDS go
+        through the store; their records are StoredFeedback tuples.
+
+        Example:
+            store = FeedbackStore("vinted_feedbacks.sqlite", max_age=30 * 24 * 3600)
+            vinted = Vinted(domain="it", feedback_store=store)
+        """
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def covers(projection: Projection) -> bool:
+        """
+        Whether the store holds every field of `projection`.
+        """
+        if projection is None or isinstance(projection, type):
+            return False
+        return all(field in STORED_FEEDBACK_FIELDS for field in projection)
+
+    def page(
+        self,
+        user_id: int,
+        page: int,
+        per_page: int,
+        fetch: Callable[[], ProjectedResponse],
+        max_age: float = None,
+    ) -> ProjectedResponse:
+        """
+        Return a stored page if it is fresh enough, otherwise `fetch()` it (projected
+        on StoredFeedback) and store it.
+        """
+        stored = self.get(user_id, page, per_page, max_age)
+        with self._lock:
+            if stored is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if stored is not None:
+            return stored
+        response = fetch()
+        self.put(user_id, page, per_page, response)
+        return response
+
+    def get(
+        self, user_id: int, page: int, per_page: int = 20, max_age: float = None
+    ) -> Optional[ProjectedResponse]:
+        """
+        Return the stored page, or None if it is missing or older than `max_age`
+        (the store's default when None).
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT current_page, total_pages, total_entries, time, fetched_at
+                FROM pages WHERE user_id = ? AND per_page = ? AND page = ?
+                """,
+                (user_id, per_page, page),
+            ).fetchone()
+            if row is None or time.time() - row[4] > max_age:
+                return None
+            records = self._conn.execute(
+                """
+                SELECT id, feedback_user_id, user_id, rating, item_id, item_title,
+                       created_at_ts, system_feedback
+                FROM feedbacks WHERE user_id = ? AND per_page = ? AND page = ?
+                ORDER BY position
+                """,
+                (user_id, per_page, page),
+            ).fetchall()
+        current_page, total_pages, total_entries, page_time, _ = row
+        pagination = None
+        if current_page is not None:
+            pagination = Pagination(
+                current_page=current_page,
+                per_page=per_page,
+                time=page_time,
+                total_entries=total_entries,
+                total_pages=total_pages,
+            )
+        return ProjectedResponse(
+            pagination=pagination, records=[StoredFeedback(*record) for record in records]
+        )
+
+    def put(self, user_id: int, page: int, per_page: int, response: ProjectedResponse) -> None:
+        pagination = response.pagination
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM feedbacks WHERE user_id = ? AND per_page = ? AND page = ?",
+                (user_id, per_page, page),
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO feedbacks (user_id, per_page, page, position, id, feedback_user_id,
+                                       rating, item_id, item_title, created_at_ts, system_feedback)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        user_id,
+                        per_page,
+                        page,
+                        position,
+                        record.id,
+                        record.feedback_user_id,
+                        record.rating,
+                        record.item_id,
+                        record.item_title,
+                        record.created_at_ts,
+                        record.system_feedback,
+                    )
+                    for position, record in enumerate(response.records)
+                ],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    user_id,
+                    per_page,
+                    page,
+                    getattr(pagination, "current_page", None),
+                    getattr(pagination, "total_pages", None),
+                    getattr(pagination, "total_entries", None),
+                    getattr(pagination, "time", None),
+                    now,
+                ),
+            )
+
+    def find(
+        self, user_id: int, author_id: int, item_id: int = None
+    ) -> Optional[StoredFeedback]:
+        """
+        Return the most recently fetched feedback left by `author_id` to `user_id`
+        (for `item_id` when given) among the stored pages, whatever their age: a
+        feedback does not disappear once given, so a match stays valid while a miss
+        may only mean the page is old.
+        """
+        query = """
+            SELECT f.id, f.feedback_user_id, f.user_id, f.rating, f.item_id, f.item_title,
+                   f.created_at_ts, f.system_feedback
+            FROM feedbacks f JOIN pages p USING (user_id, per_page, page)
+            WHERE f.user_id = ? AND f.feedback_user_id = ?
+        """
+        args = [user_id, author_id]
+        if item_id is not None:
+            query += " AND f.item_id = ?"
+            args.append(item_id)
+        with self._lock:
+            row = self._conn.execute(
+                query + " ORDER BY p.fetched_at DESC LIMIT 1", args
+            ).fetchone()
+        return StoredFeedback(*row) if row else None
+
+    def fetched_pages(self, user_id: int, per_page: int = 20) -> Dict[int, float]:
+        """
+        Return {page: fetched_at} of the stored pages of a user.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, fetched_at FROM pages WHERE user_id = ? AND per_page = ?",
+                (user_id, per_page),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
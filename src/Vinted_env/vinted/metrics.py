@@ -0,0 +1,255 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, shared by the latency, parse and throttle histograms
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass(slots=True)
+class RequestEvent:
+    """
+    One HTTP attempt, as passed to the metrics hooks.
+    """
+
+    endpoint: str
+    url: str
+    status_code: Optional[int]  # None when the request raised
+    latency: float  # seconds spent in the HTTP call
+    waited: float  # seconds spent waiting for the rate limiter
+    size: int  # response body bytes
+    retry: bool  # whether this attempt is a retry (blocked response, 401, batch error)
+    error: Optional[BaseException] = None
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float | str]:
+        """
+        Upper bound of the bucket holding the q-quantile, "+Inf" past the last bucket
+        and None without observations.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return "+Inf"
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+@dataclass
+class EndpointMetrics:
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    bytes: int = 0
+    status: Counter = field(default_factory=Counter)
+    latency: Histogram = field(init=False)
+    parse_time: Histogram = field(init=False)
+    throttle_wait: Histogram = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.latency = Histogram(self.buckets)
+        self.parse_time = Histogram(self.buckets)
+        self.throttle_wait = Histogram(self.buckets)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "bytes": self.bytes,
+            "status": {str(code): n for code, n in sorted(self.status.items())},
+            "latency": self.latency.to_dict(),
+            "parse_time": self.parse_time.to_dict(),
+            "throttle_wait": self.throttle_wait.to_dict(),
+        }
+
+
+class Metrics:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """
+        Per-endpoint request metrics collected by the Vinted client.
+
+        For every endpoint it counts requests, retries, transport errors, cache hits,
+        status codes and body bytes, and keeps histograms of the HTTP latency, of the
+        JSON parse + model decode time and of the time spent waiting for the rate
+        limiter. Comparing the three tells whether a crawl is network-bound,
+        parse-bound or throttled.
+
+        Args:
+            buckets: Histogram upper bounds in seconds
+
+        Example:
+            metrics = Metrics()
+            vinted = Vinted(domain="it", metrics=metrics)
+            ...
+            metrics.write_prometheus("vinted.prom")
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._endpoints: Dict[str, EndpointMetrics] = defaultdict(
+            lambda: EndpointMetrics(self.buckets)
+        )
+        self._hooks: List[Callable[[RequestEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        """
+        Call `hook(event)` after every HTTP attempt. Hooks run on the requesting
+        thread, so they should be fast; their exceptions are logged and ignored.
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RequestEvent], None]) -> None:
+        self._hooks.remove(hook)
+
+    def record_request(self, event: RequestEvent) -> None:
+        with self._lock:
+            stats = self._endpoints[event.endpoint]
+            stats.requests += 1
+            stats.retries += event.retry
+            if event.status_code is None:
+                stats.errors += 1
+            else:
+                stats.status[event.status_code] += 1
+            stats.bytes += event.size
+            stats.latency.observe(event.latency)
+            stats.throttle_wait.observe(event.waited)
+
+        for hook in self._hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                logger.warning("Metrics hook %r failed: %s", hook, e)
+
+    def record_parse(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._endpoints[endpoint].parse_time.observe(seconds)
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoints[endpoint].cache_hits += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "elapsed": time.time() - self.started_at,
+                "endpoints": {
+                    name: stats.to_dict()
+                    for name, stats in sorted(self._endpoints.items())
+                },
+            }
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            counters = [
+                ("vinted_requests_total", "HTTP requests sent", "requests"),
+                ("vinted_retries_total", "Requests sent again after a failed attempt", "retries"),
+                ("vinted_errors_total", "Requests failed without a response", "errors"),
+                ("vinted_cache_hits_total", "Responses served from the cache", "cache_hits"),
+                ("vinted_response_bytes_total", "Response body bytes received", "bytes"),
+            ]
+            for name, help_text, attribute in counters:
+                header(name, "counter", help_text)
+                for endpoint, stats in endpoints:
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {getattr(stats, attribute)}')
+
+            header("vinted_responses_total", "counter", "Responses by status code")
+            for endpoint, stats in endpoints:
+                for code, count in sorted(stats.status.items()):
+                    lines.append(
+                        f'vinted_responses_total{{endpoint="{endpoint}",status="{code}"}} {count}'
+                    )
+
+            histograms = [
+                ("vinted_request_duration_seconds", "HTTP request latency", "latency"),
+                ("vinted_parse_duration_seconds", "JSON parse and decode time", "parse_time"),
+                ("vinted_throttle_wait_seconds", "Time spent waiting for the rate limiter", "throttle_wait"),
+            ]
+            for name, help_text, attribute in histograms:
+                header(name, "histogram", help_text)
+                for endpoint, stats in endpoints:
+                    histogram = getattr(stats, attribute)
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: str) -> None:
+        with atomic_write(path) as f:
+            f.write(self.to_json())
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the metrics to a file suitable for the node_exporter textfile collector.
+        """
+        with atomic_write(path) as f:
+            f.write(self.to_prometheus())
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional, Literal
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Pagination:
     current_page: int
     per_page: int
@@ -11,7 +11,7 @@ class Pagination:
     total_pages: int
 
 
-@dataclass
+@dataclass(slots=True)
 class VintedResponse:
     code: Literal[
         -200,
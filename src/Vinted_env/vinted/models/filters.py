@@ -4,13 +4,13 @@ from dataclasses import dataclass
 from typing import Any, List, Literal, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectedFilter:
     code: str
     ids: list
 
 
-@dataclass
+@dataclass(slots=True)
 class FilterOption:
     id: int
     title: str
@@ -18,19 +18,19 @@ class FilterOption:
     options: Optional[List["FilterOption"]]
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchTranslationsNoResults:
     body: str
     title: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchTranslations:
     placeholder: Optional[str]
     no_results: Optional[SearchTranslationsNoResults]
 
 
-@dataclass
+@dataclass(slots=True)
 class Filter:
     id: int
     title: str
@@ -44,7 +44,7 @@ class Filter:
     position: int
 
 
-@dataclass
+@dataclass(slots=True)
 class InitializersFilters:
     query: str
     catalogIds: list
@@ -64,13 +64,13 @@ class InitializersFilters:
     disableSearchSaving: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class CatalogPhoto:
     url: Optional[str]
     thumbnails: Optional[List[PhotoThumbnail]]
 
 
-@dataclass
+@dataclass(slots=True)
 class Catalog:
     id: int
     title: str
@@ -103,13 +103,13 @@ class Catalog:
     url_en: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectedDynamicFilter:
     code: str
     ids: list
 
 
-@dataclass
+@dataclass(slots=True)
 class InitializersDtos:
     catalogs: List[Catalog]
     dynamicFilters: List[Filter]
@@ -118,13 +118,13 @@ class InitializersDtos:
     selectedDefaultFilters: list
 
 
-@dataclass
+@dataclass(slots=True)
 class FiltersResponse(VintedResponse):
     filters: List[Filter]
     selected_filters: List[SelectedFilter]
 
 
-@dataclass
+@dataclass(slots=True)
 class InitializersResponse(VintedResponse):
     dtos: InitializersDtos
     filters: InitializersFilters
@@ -7,7 +7,7 @@ from typing import List, Any, Optional
 from numbers import Number
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: int
     login: str
@@ -16,7 +16,7 @@ class User:
     business: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class BrandDto:
     id: int
     title: Optional[str]
@@ -34,7 +34,7 @@ class BrandDto:
     is_favourite: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class BrandDtoShort:
     id: int
     title: Optional[str]
@@ -43,19 +43,19 @@ class BrandDtoShort:
     is_favourite: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemBox:
     first_line: Optional[str]
     second_line: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchParams:
     score: Optional[Number]
     matched_queries: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemPhoto:
     id: int
     image_no: int
@@ -73,7 +73,7 @@ class ItemPhoto:
     extra: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     id: int
     title: str
@@ -100,13 +100,13 @@ class Item:
     search_tracking_params: Optional[SearchParams]
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemAttribute:
     code: Optional[str]
     ids: List[int]
 
 
-@dataclass
+@dataclass(slots=True)
 class DescriptionAttribute:
     code: Optional[str]
     title: Optional[str]
@@ -114,13 +114,13 @@ class DescriptionAttribute:
     faq_id: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemAlert:
     # TODO: Define structure
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class DetailedItem:
     id: int
     title: str
@@ -170,13 +170,13 @@ class DetailedItem:
     stats_visible: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemsResponse(VintedResponse):
     item: DetailedItem
     plugins: Optional[List[Any]]  # TODO: Define a proper type for plugins
 
 
-@dataclass
+@dataclass(slots=True)
 class UserItemsResponse(VintedResponse):
     drafts: Optional[List[DetailedItem]]
     items: List[DetailedItem]
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class MethodPay:
     id: int
     code: Optional[str]
@@ -15,13 +15,13 @@ class MethodPay:
     method_change_possible: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CurrencyAmount:
     amount: Optional[str]
     currency_code: Optional[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Conversion:
     seller_price: Optional[str]
     seller_currency: Optional[str]
@@ -31,7 +31,7 @@ class Conversion:
     fx_markup_rate: Optional[str]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Price:
     amount: Optional[str]
     currency_code: Optional[str]
@@ -2,14 +2,14 @@ from dataclasses import dataclass
 from typing import Any, Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PhotoHighResolution:
     id: str
     timestamp: int
     orientation: Any
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PhotoThumbnail:
     type: str
     url: Optional[str]
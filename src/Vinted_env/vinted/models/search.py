@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class DominantBrand:
     id: int
     title: str
@@ -23,13 +23,13 @@ class DominantBrand:
     is_favourite: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchTrackingParams:
     search_correlation_id: str
     search_session_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchSuggestionParam:
     title: List[str]
     entity_combination: List[str]
@@ -37,7 +37,7 @@ class SearchSuggestionParam:
     search_signals: List[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchSuggestion:
     title: str
     total_score: int
@@ -47,18 +47,18 @@ class SearchSuggestion:
     suggestion_type: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResponse(VintedResponse):
     dominant_brand: Optional[DominantBrand]
     items: List[Item]
     search_tracking_params: SearchTrackingParams
 
 
-@dataclass
+@dataclass(slots=True)
 class UserSearchResponse(VintedResponse):
     users: List[DetailedUser]
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchSuggestionsResponse(VintedResponse):
     search_suggestions: List[SearchSuggestion]
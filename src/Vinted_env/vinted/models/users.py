@@ -5,27 +5,27 @@ from dataclasses import dataclass
 from typing import Optional, Any, List
 
 
-@dataclass
+@dataclass(slots=True)
 class UserVerificationOption:
     valid: bool
     verified_at: Optional[Any]
     available: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class UserVerification:
     email: UserVerificationOption
     facebook: UserVerificationOption
     google: UserVerificationOption
 
 
-@dataclass
+@dataclass(slots=True)
 class Discount:
     minimal_item_count: int
     fraction: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class BundleDiscount:
     id: int
     user_id: int
@@ -35,7 +35,7 @@ class BundleDiscount:
     discounts: List[Discount]
 
 
-@dataclass
+@dataclass(slots=True)
 class UserPhoto:
     id: Optional[int]
     width: Optional[int]
@@ -53,7 +53,7 @@ class UserPhoto:
     extra: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class DetailedUser:
     id: int
     anon_id: str
@@ -129,7 +129,7 @@ class DetailedUser:
     business: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ShortUser:
     id: int
     login: str
@@ -137,13 +137,13 @@ class ShortUser:
     photo: Optional[UserPhoto]
 
 
-@dataclass
+@dataclass(slots=True)
 class Comment:
     comment: Optional[str]
     user: Optional[ShortUser]
 
 
-@dataclass
+@dataclass(slots=True)
 class UserFeedback:
     id: int
     created_at_ts: str
@@ -169,7 +169,7 @@ class UserFeedback:
     feedback_url: str
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedbacksSummary:
     feedback_count: int
     feedback_rating: Optional[str]
@@ -179,27 +179,27 @@ class FeedbacksSummary:
     user_feedback_rating: Optional[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class UserFeedbacksSummaryResponse(VintedResponse):
     user_feedback_summary: Optional[FeedbacksSummary] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class UserFeedbacksResponse(VintedResponse):
     user_feedbacks: List[UserFeedback]
 
 
-@dataclass
+@dataclass(slots=True)
 class UserResponse(VintedResponse):
     user: DetailedUser
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SellerBadge:
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ItemUser:
     id: int
     login: str
@@ -0,0 +1,133 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+from .projection import ProjectedResponse
+
+
+def page_parts(response, list_key: str) -> Tuple[List[Any], bool]:
+    """
+    Return the records of a page and whether more pages follow it.
+
+    Handles typed responses, ProjectedResponse and raw JSON dicts (which is also what
+    _get returns when a response does not fit its model).
+    """
+    if isinstance(response, ProjectedResponse):
+        records, pagination = response.records, response.pagination
+    elif isinstance(response, dict):
+        records, pagination = response.get(list_key) or [], response.get("pagination")
+    else:
+        records, pagination = getattr(response, list_key) or [], response.pagination
+
+    if not records or not pagination:
+        return records, False
+    if isinstance(pagination, dict):
+        current, total = pagination.get("current_page"), pagination.get("total_pages")
+    else:
+        current, total = pagination.current_page, pagination.total_pages
+    has_next = current is not None and total is not None and current < total
+    return records, has_next
+
+
+def record_id(record) -> Any:
+    """
+    Return the "id" of a record, whatever its shape (model, namedtuple or dict).
+    """
+    if isinstance(record, dict):
+        return record.get("id")
+    return getattr(record, "id", None)
+
+
+def page_total(response) -> Optional[int]:
+    """
+    Return the total number of records reported by a paginated response, if any.
+    """
+    if isinstance(response, dict):
+        pagination = response.get("pagination") or {}
+        return pagination.get("total_entries")
+    pagination = getattr(response, "pagination", None)
+    if isinstance(pagination, dict):
+        return pagination.get("total_entries")
+    return getattr(pagination, "total_entries", None)
+
+
+def paginate(
+    fetch_page: Callable[[int], Any],
+    list_key: str,
+    start_page: int = 1,
+    max_pages: int = None,
+    prefetch: bool = True,
+) -> Iterator[Any]:
+    """
+    Yield the records of consecutive pages returned by `fetch_page(page)`.
+
+    With `prefetch` the request for page N+1 is issued on a background thread as soon
+    as page N arrives, so it overlaps with the caller processing page N. Closing the
+    generator early (break, return) stops the pagination; at most one prefetched page
+    is wasted.
+    """
+    for _, records in paginate_pages(fetch_page, list_key, start_page, max_pages, prefetch):
+        yield from records
+
+
+def paginate_pages(
+    fetch_page: Callable[[int], Any],
+    list_key: str,
+    start_page: int = 1,
+    max_pages: int = None,
+    prefetch: bool = True,
+) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    Like paginate(), but yield `(page, records)` per page, for callers checkpointing
+    their progress page by page.
+    """
+    last_page = start_page + max_pages - 1 if max_pages else None
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = start_page
+        pending = None
+        while True:
+            response = pending.result() if pending else fetch_page(page)
+            pending = None
+            records, has_next = page_parts(response, list_key)
+            has_next = has_next and (last_page is None or page < last_page)
+            if has_next and executor:
+                pending = executor.submit(fetch_page, page + 1)
+            yield page, records
+            if not has_next:
+                return
+            page += 1
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def apaginate(
+    fetch_page: Callable[[int], Awaitable[Any]],
+    list_key: str,
+    start_page: int = 1,
+    max_pages: int = None,
+    prefetch: bool = True,
+) -> AsyncIterator[Any]:
+    """
+    Async counterpart of paginate(), prefetching the next page as an asyncio task.
+    """
+    last_page = start_page + max_pages - 1 if max_pages else None
+    page = start_page
+    pending = None
+    try:
+        while True:
+            response = await pending if pending else await fetch_page(page)
+            pending = None
+            records, has_next = page_parts(response, list_key)
+            has_next = has_next and (last_page is None or page < last_page)
+            if has_next and prefetch:
+                pending = asyncio.ensure_future(fetch_page(page + 1))
+            for record in records:
+                yield record
+            if not has_next:
+                return
+            page += 1
+    finally:
+        if pending and not pending.done():
+            pending.cancel()
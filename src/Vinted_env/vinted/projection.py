@@ -0,0 +1,87 @@
+import threading
+from collections import namedtuple
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from .decoders import decode
+from .models.base import Pagination
+
+# A projection is either a list of (optionally dotted) JSON field names, which yields
+# namedtuples with "." replaced by "_", or a NamedTuple/dataclass record type whose
+# field names are looked up as top-level JSON keys.
+Projection = Union[Sequence[str], Type]
+
+_EXTRACTORS: Dict[Any, Callable[[dict], Any]] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass
+class ProjectedResponse:
+    pagination: Optional[Pagination]
+    records: List[Any]
+
+
+def _record_type(projection: Projection) -> Tuple[type, List[Tuple[str, ...]]]:
+    if isinstance(projection, type):
+        if hasattr(projection, "_fields"):
+            names = list(projection._fields)
+        elif is_dataclass(projection):
+            names = [f.name for f in fields(projection) if f.init]
+        else:
+            raise TypeError(f"{projection!r} is neither a NamedTuple nor a dataclass")
+        return projection, [(name,) for name in names]
+
+    paths = [tuple(name.split(".")) for name in projection]
+    names = ["_".join(path) for path in paths]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Projected field names collide: {names}")
+    return namedtuple("Record", names), paths
+
+
+def _access(path: Tuple[str, ...]) -> str:
+    expression = "data"
+    for depth, key in enumerate(path):
+        if depth < len(path) - 1:
+            expression = f"({expression}.get({key!r}) or EMPTY)"
+        else:
+            expression = f"{expression}.get({key!r})"
+    return expression
+
+
+def compile_projection(projection: Projection) -> Callable[[dict], Any]:
+    """
+    Return a function extracting only the projected fields of a JSON record, without
+    materializing the nested model objects. Missing fields are returned as None.
+
+    Example:
+        extract = compile_projection(["feedback_user_id", "user.login"])
+        extract(feedback_json)  # Record(feedback_user_id=..., user_login=...)
+    """
+    key = projection if isinstance(projection, type) else tuple(projection)
+    extractor = _EXTRACTORS.get(key)
+    if extractor is not None:
+        return extractor
+
+    with _LOCK:
+        if key not in _EXTRACTORS:
+            record_type, paths = _record_type(projection)
+            source = f"lambda data: record_type({', '.join(_access(p) for p in paths)})"
+            _EXTRACTORS[key] = eval(source, {"record_type": record_type, "EMPTY": {}})
+        return _EXTRACTORS[key]
+
+
+def projected_response(list_key: str, projection: Projection) -> Callable[[dict], ProjectedResponse]:
+    """
+    Return a decoder turning a paginated response into a ProjectedResponse whose
+    records are the projected entries of `list_key` (e.g. "user_feedbacks", "items").
+    """
+    extract = compile_projection(projection)
+
+    def decoder(data: dict) -> ProjectedResponse:
+        pagination = data.get("pagination")
+        return ProjectedResponse(
+            pagination=decode(Pagination, pagination) if pagination else None,
+            records=[extract(record) for record in data.get(list_key) or ()],
+        )
+
+    return decoder
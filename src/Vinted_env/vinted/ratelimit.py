@@ -0,0 +1,131 @@
+import logging
+import random
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRateLimiter:
+    def __init__(
+        self,
+        rate: float = 0.2,
+        min_rate: float = 0.02,
+        max_rate: float = 2.0,
+        burst: int = 1,
+        increase: float = 0.01,
+        decrease: float = 0.5,
+        penalty: float = 60.0,
+        jitter: float = 0.0,
+    ) -> None:
+        """
+        Token bucket whose refill rate follows an AIMD (additive increase,
+        multiplicative decrease) policy driven by the observed status codes.
+
+        Every successful response adds `increase` requests/second to the rate, every
+        throttled (429/403) response multiplies it by `decrease` and pauses the whole
+        bucket for `penalty` seconds, unless it came through a proxy of a ProxyPool,
+        which quarantines that proxy instead. Server errors and transport failures only
+        apply the multiplicative decrease; other client errors (404, 401...) say
+        nothing about the pace and leave the rate unchanged.
+
+        Args:
+            rate: Initial rate in requests per second
+            min_rate: Lower bound for the rate
+            max_rate: Upper bound for the rate
+            burst: Bucket capacity, i.e. how many requests may be sent back to back
+            increase: Additive step applied after each successful response
+            decrease: Multiplicative factor applied after a throttled or failed response
+            penalty: Pause in seconds after a 429/403 response
+            jitter: Random extra delay, as a fraction of the wait, to avoid a fixed cadence
+
+        Example:
+            limiter = AdaptiveRateLimiter(rate=0.1, max_rate=1.0, penalty=120)
+            vinted = Vinted(domain="it", rate_limiter=limiter)
+        """
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Expected 0 < min_rate <= rate <= max_rate")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.penalty = penalty
+        self.jitter = jitter
+
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - max(self._last_refill, self._blocked_until)
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = max(self._last_refill, now)
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._blocked_until:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._blocked_until - now
+            wait *= 1 + random.uniform(0, self.jitter)
+            time.sleep(wait)
+            waited += wait
+
+    def record(self, status_code: Optional[int], proxy: str = None) -> None:
+        """
+        Adapt the rate to the outcome of a request.
+
+        Args:
+            status_code: HTTP status code of the response, or None if the request
+                failed before a response was received.
+            proxy: Proxy of a ProxyPool the request went through, if any. A 429/403
+                on it is left to the pool's quarantine instead of pausing every request.
+        """
+        throttled = status_code in (403, 429)
+        if status_code is not None and 400 <= status_code < 500 and not throttled:
+            return
+        with self._lock:
+            if status_code is not None and status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                return
+
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            if throttled and proxy is not None:
+                logger.warning(
+                    "Throttled with HTTP %s on proxy %s, rate lowered to %.3f req/s",
+                    status_code,
+                    proxy,
+                    self.rate,
+                )
+            elif throttled:
+                self._blocked_until = time.monotonic() + self.penalty
+                self._tokens = 0.0
+                logger.warning(
+                    "Throttled with HTTP %s, pausing %.0fs, rate lowered to %.3f req/s",
+                    status_code,
+                    self.penalty,
+                    self.rate,
+                )
+            else:
+                logger.info("Request failed, rate lowered to %.3f req/s", self.rate)
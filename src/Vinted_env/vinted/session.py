@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+from requests.cookies import RequestsCookieJar, cookiejar_from_dict, create_cookie
+
+from .utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+def parse_cookie_string(cookie_string: str) -> Dict[str, str]:
+    """
+    Parse a raw "name=value; other=value" Cookie header copied from a browser.
+    """
+    cookies = {}
+    for pair in cookie_string.strip().rstrip(";").split(";"):
+        if "=" in pair:
+            name, value = pair.split("=", 1)
+            cookies[name.strip()] = value.strip()
+    return cookies
+
+
+class SessionManager:
+    def __init__(
+        self,
+        path: str = None,
+        ttl: float = 3600.0,
+        refresh_margin: float = 300.0,
+        background_refresh: bool = False,
+        lock_timeout: float = 60.0,
+    ) -> None:
+        """
+        Owner of the cookie jar of a Vinted client.
+
+        The Cloudflare/Vinted handshake (a GET of the home page) is performed lazily,
+        on the first request that needs cookies, instead of in Vinted.__init__. When a
+        `path` is given the jar is persisted there as JSON and reused by every process
+        pointing at the same file, so a new process starts without any handshake as
+        long as the stored cookies are fresh. Only one process performs a refresh at a
+        time (guarded by a "<path>.lock" file); the others wait and load its result.
+
+        The jar is considered stale `refresh_margin` seconds before the earliest
+        cookie expiry, capped to `ttl` seconds after the handshake. With
+        `background_refresh` a daemon thread renews it before that moment, so requests
+        never wait for a handshake.
+
+        Cookies supplied with set() (e.g. copied from a browser) are pinned: they are
+        used as they are, never renewed with an anonymous handshake nor saved to or
+        replaced from `path`, until refresh() is called explicitly.
+
+        Args:
+            path: Optional JSON file holding the jar, one file per Vinted domain
+            ttl: Maximum lifetime in seconds of a jar
+            refresh_margin: Seconds before expiry at which the jar is renewed
+            background_refresh: Renew the jar proactively on a daemon thread
+            lock_timeout: Age in seconds after which another process' lock is ignored
+
+        Example:
+            vinted = Vinted(domain="it", session=SessionManager("cookies_it.json"))
+        """
+        self.path = path
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.lock_timeout = lock_timeout
+
+        self.jar: Optional[RequestsCookieJar] = None
+        self.fetched_at = 0.0
+        self.expires_at = 0.0
+        self.pinned = False
+
+        self._fetch: Optional[Callable[[], RequestsCookieJar]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def bind(self, fetch: Callable[[], RequestsCookieJar]) -> None:
+        """
+        Set the function performing the handshake, called by the Vinted client.
+        """
+        self._fetch = fetch
+
+    def is_fresh(self, now: float = None) -> bool:
+        now = time.time() if now is None else now
+        return self.jar is not None and now < self.expires_at - self.refresh_margin
+
+    def get(self) -> RequestsCookieJar:
+        """
+        Return the current jar, loading it from disk or performing the handshake first
+        if it is missing or stale.
+        """
+        if self.is_fresh():
+            return self.jar
+        with self._lock:
+            if not self.is_fresh():
+                self._load()
+            if not self.is_fresh():
+                self._refresh()
+        self._start_refresher()
+        return self.jar
+
+    def refresh(self, stale_before: float = None) -> RequestsCookieJar:
+        """
+        Perform a new handshake and store the resulting jar.
+
+        Args:
+            stale_before: Only refresh if the current jar was obtained before this
+                time.time() value. Pass the start time of a request rejected with
+                401/403 so that concurrent failures trigger a single handshake.
+                Pinned cookies are kept in this case.
+        """
+        with self._lock:
+            if stale_before is not None:
+                if self.pinned:
+                    logger.warning("Request rejected with pinned cookies, not refreshing them")
+                    return self.jar
+                self._load()
+                if self.jar is not None and self.fetched_at >= stale_before:
+                    logger.debug("Cookies already refreshed by another request")
+                    return self.jar
+            elif self.pinned:
+                # An explicit refresh replaces pinned cookies as well
+                self.pinned = False
+                self.expires_at = 0.0
+            self._refresh()
+        return self.jar
+
+    def set(self, cookies: Union[RequestsCookieJar, Dict[str, str], str]) -> None:
+        """
+        Replace the jar with custom cookies (a jar, a dict or a raw Cookie header),
+        pinned until the next explicit refresh().
+        """
+        if isinstance(cookies, str):
+            cookies = parse_cookie_string(cookies)
+        with self._lock:
+            self._store(cookies, pinned=True)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.jar = None
+            self.expires_at = 0.0
+            self.pinned = False
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _refresh(self) -> None:
+        if self._fetch is None:
+            raise RuntimeError("SessionManager is not bound to a Vinted client")
+
+        if self.path is None:
+            self._store(self._fetch())
+            return
+
+        lock_path = f"{self.path}.lock"
+        started = time.time()
+        while not self._acquire_file_lock(lock_path):
+            # Another process is refreshing: wait for it and use its cookies
+            time.sleep(0.2)
+            if self._load() and self.fetched_at >= started:
+                return
+        try:
+            self._store(self._fetch())
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def _acquire_file_lock(self, lock_path: str) -> bool:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                    logger.warning("Removing stale cookie lock: %s", lock_path)
+                    os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def _store(self, jar, pinned: bool = False) -> None:
+        if not isinstance(jar, RequestsCookieJar):
+            jar = cookiejar_from_dict(dict(jar))
+        now = time.time()
+        self.jar = jar
+        self.fetched_at = now
+        self.pinned = pinned
+        if pinned:
+            # Kept in memory only: the shared file holds renewable jars
+            self.expires_at = float("inf")
+            logger.info("Cookie jar pinned, %s cookies", len(jar))
+            return
+        expiries = [c.expires for c in jar if c.expires and c.expires > now]
+        self.expires_at = min([now + self.ttl, *expiries])
+        logger.info(
+            "Cookie jar updated, %s cookies valid for %.0fs",
+            len(jar),
+            self.expires_at - now,
+        )
+        if self.path is not None:
+            self._save()
+
+    def _save(self) -> None:
+        state = {
+            "fetched_at": self.fetched_at,
+            "expires_at": self.expires_at,
+            "cookies": [
+                {
+                    "name": c.name,
+                    "value": c.value,
+                    "domain": c.domain,
+                    "path": c.path,
+                    "expires": c.expires,
+                    "secure": c.secure,
+                }
+                for c in self.jar
+            ],
+        }
+        with atomic_write(self.path) as f:
+            json.dump(state, f)
+
+    def _load(self) -> bool:
+        """
+        Load the persisted jar if it is newer than the one in memory and that one is
+        not pinned.
+        """
+        if self.pinned or self.path is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cookie file %s: %s", self.path, e)
+            return False
+        if state["fetched_at"] <= self.fetched_at:
+            return False
+
+        jar = RequestsCookieJar()
+        for c in state["cookies"]:
+            jar.set_cookie(create_cookie(**c))
+        self.jar = jar
+        self.fetched_at = state["fetched_at"]
+        self.expires_at = state["expires_at"]
+        logger.debug("Loaded %s cookies from %s", len(jar), self.path)
+        return True
+
+    def _start_refresher(self) -> None:
+        if not self.background_refresh or self._refresher is not None:
+            return
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(
+                    target=self._refresh_loop, name="vinted-cookies", daemon=True
+                )
+                self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            # Pinned jars never expire: just check again later in case they get unpinned
+            delay = min(self.expires_at - self.refresh_margin - time.time(), self.ttl)
+            if self._stop.wait(max(delay, 1.0)):
+                return
+            if self.pinned or self.is_fresh():
+                continue
+            try:
+                with self._lock:
+                    if not self._load() or not self.is_fresh():
+                        self._refresh()
+            except Exception as e:
+                logger.warning("Background cookie refresh failed: %s", e)
+                self._stop.wait(30)
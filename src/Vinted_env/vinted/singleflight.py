@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Coalesce concurrent identical calls: while a call for a key is in flight,
+        other threads asking for the same key wait for it and get its result (or its
+        exception) instead of running the function again. Nothing is kept once the
+        call completes, so this is not a cache.
+
+        Example:
+            flights = SingleFlight()
+            body, shared = flights.do("/users/42", lambda: fetch("/users/42"))
+        """
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # calls served by another thread's request
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return `func()`, or the result of the identical call already in flight, and
+        whether the result came from that other caller's call.
+
+        `func` must not call do() again with the same key, it would wait for itself.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
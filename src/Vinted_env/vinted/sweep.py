@@ -0,0 +1,176 @@
+import logging
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .batch import retry_call
+from .catalog import CatalogIndex
+from .pagination import page_parts, page_total, record_id
+
+logger = logging.getLogger(__name__)
+
+# Results a single query can reach by paging; past it the site stops serving pages
+DEFAULT_MAX_RESULTS = 960
+
+# Upper price of the first band when an open ended price range has to be split
+OPEN_BAND_PRICE = 50.0
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    catalog_id: Optional[int] = None
+    price_from: Optional[float] = None
+    price_to: Optional[float] = None
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            "catalog_ids": self.catalog_id,
+            "price_from": self.price_from,
+            "price_to": self.price_to,
+        }
+
+
+@dataclass
+class SweepStats:
+    shards: int = 0
+    splits: int = 0
+    pages: int = 0
+    items: int = 0
+    duplicates: int = 0
+    # Shards still over the cap that could not be split further, with their totals
+    truncated: List[Tuple[Shard, int]] = field(default_factory=list)
+    failed: List[Tuple[Shard, BaseException]] = field(default_factory=list)
+
+
+def _split_price(shard: Shard, min_price_step: float) -> List[Shard]:
+    low = shard.price_from or 0.0
+    high = shard.price_to
+    if high is None:
+        middle = max(low * 2, low + OPEN_BAND_PRICE)
+    else:
+        if high - low < min_price_step:
+            return []
+        middle = round((low + high) / 2, 2)
+    # Price bounds are inclusive: an item priced exactly `middle` is found by both
+    # halves and dropped by the deduplication
+    return [
+        Shard(shard.catalog_id, shard.price_from, middle),
+        Shard(shard.catalog_id, middle, high),
+    ]
+
+
+def _split(
+    shard: Shard, index: Optional[CatalogIndex], min_price_step: float
+) -> List[Shard]:
+    # Subcatalogs first: they partition the results without any overlap
+    if index is not None and shard.price_from is None and shard.price_to is None:
+        if shard.catalog_id is None:
+            return [Shard(node.id) for node in index.roots]
+        if shard.catalog_id in index and not index.get(shard.catalog_id).is_leaf:
+            return [Shard(node.id) for node in index.children(shard.catalog_id)]
+    return _split_price(shard, min_price_step)
+
+
+def sweep(
+    fetch_page: Callable[..., Any],
+    shards: Iterable[Shard] = (Shard(),),
+    index: CatalogIndex = None,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    per_page: int = 96,
+    max_workers: int = 4,
+    retries: int = 2,
+    min_price_step: float = 0.5,
+    stats: SweepStats = None,
+) -> Iterator[Any]:
+    """
+    Yield every distinct item matched by a search, beyond the number of results a
+    single query can page through.
+
+    Each shard is probed with its first page. If it reports more than
+    `max_results` items it is split, into its subcatalogs when an `index` is
+    given, then into two price bands, until every shard fits. Shards fitting
+    under the cap are paged to the end. Shards run in parallel on `max_workers`
+    threads and items are deduplicated by id, yielded as soon as their page
+    completes.
+
+    `fetch_page(page=..., per_page=..., catalog_ids=..., price_from=..., price_to=...)`
+    performs the search, typically a partial of Vinted.search() carrying the other
+    filters. Bands narrower than `min_price_step` are not split: their first
+    `max_results` items are returned and the shard is listed in `stats.truncated`.
+    Failed pages (after `retries` for transient errors) end their shard and are
+    listed in `stats.failed`.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    stats = SweepStats() if stats is None else stats
+    max_pages = max(1, math.ceil(max_results / per_page))
+    stats_lock = threading.Lock()
+
+    def fetch(shard: Shard, page: int):
+        with stats_lock:
+            stats.pages += 1
+        return fetch_page(page=page, per_page=per_page, **shard.params())
+
+    def run(shard: Shard) -> Tuple[List[Any], List[Shard]]:
+        result = retry_call(lambda page: fetch(shard, page), 1, retries=retries)
+        if not result.ok:
+            with stats_lock:
+                stats.failed.append((shard, result.error))
+            return [], []
+        records, has_next = page_parts(result.value, "items")
+        total = page_total(result.value) or 0
+
+        if total > max_results:
+            children = _split(shard, index, min_price_step)
+            if children:
+                logger.debug("Shard %s has %s items, split in %s", shard, total, len(children))
+                with stats_lock:
+                    stats.splits += 1
+                # The first page is kept: its items belong to the children as well
+                return list(records), children
+            logger.warning("Shard %s has %s items and cannot be split further", shard, total)
+            with stats_lock:
+                stats.truncated.append((shard, total))
+
+        records = list(records)
+        page = 1
+        while has_next and page < max_pages:
+            page += 1
+            result = retry_call(lambda p: fetch(shard, p), page, retries=retries)
+            if not result.ok:
+                with stats_lock:
+                    stats.failed.append((shard, result.error))
+                break
+            page_records, has_next = page_parts(result.value, "items")
+            records.extend(page_records)
+        return records, []
+
+    seen: Set[Any] = set()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vinted-sweep")
+    pending: Dict[Future, Shard] = {}
+    try:
+        for shard in shards:
+            pending[executor.submit(run, shard)] = shard
+            stats.shards += 1
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                records, children = future.result()
+                for child in children:
+                    pending[executor.submit(run, child)] = child
+                    stats.shards += 1
+                for record in records:
+                    item_id = record_id(record)
+                    if item_id is not None:
+                        if item_id in seen:
+                            stats.duplicates += 1
+                            continue
+                        seen.add(item_id)
+                    stats.items += 1
+                    yield record
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
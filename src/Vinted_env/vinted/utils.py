@@ -1,16 +1,43 @@
+import contextlib
+import os
 import re
+from functools import lru_cache
+from typing import IO, Dict, Iterator, Tuple
+from urllib.parse import unquote, urlencode
 
 from .exceptions import InvalidUrlException
-from urllib.parse import unquote
 
+DOMAIN_PATTERN = re.compile(r"^https:\/\/www\.vinted\.([a-z]+)")
+CATALOG_PATH_PATTERN = re.compile(r"\/catalog\/(\d+)(-[a-zA-Z0-9-]+)?")
+PARAM_PATTERN = re.compile(r"([a-z_]+)(\[\])?=([a-zA-Z 0-9._À-ú+%]*)&?")
 
-def parse_url_to_params(url: str):
+# Array parameters whose name lacks the "_id" suffix in the site URLs
+MISSING_IDS_PARAMS = {"catalog", "status"}
+
+# Parameters that select a page of results, not the search itself
+PAGINATION_PARAMS = {"time", "page", "per_page"}
+
+# Numeric filters normalized by search_key so that 10, 10.0 and "10" are the same key
+NUMERIC_PARAMS = {"price_from", "price_to"}
+
+
+def parse_url_to_params(url: str) -> Dict[str, str]:
+    """
+    Convert a Vinted catalog URL (e.g. a saved search copied from the browser) into
+    search() parameters. Results are memoized per URL, so calling it for every page
+    of a sweep only parses the URL once; a new dict is returned on each call.
+    """
+    return dict(_parse_url_to_params(url))
+
+
+@lru_cache(maxsize=1024)
+def _parse_url_to_params(url: str) -> Tuple[Tuple[str, str], ...]:
     try:
         # Decode the URL
         decoded_url = unquote(url)
 
         # Match the domain part
-        matched_params = re.match(r"^https:\/\/www\.vinted\.([a-z]+)", decoded_url)
+        matched_params = DOMAIN_PATTERN.match(decoded_url)
         if not matched_params:
             raise InvalidUrlException
 
@@ -18,16 +45,13 @@ def parse_url_to_params(url: str):
         mapped_params = {}
         
         # Check if the URL contains catalog in the path
-        catalog_path_match = re.search(r"\/catalog\/(\d+)(-[a-zA-Z0-9-]+)?", decoded_url)
+        catalog_path_match = CATALOG_PATH_PATTERN.search(decoded_url)
         if catalog_path_match:
             catalog_id = catalog_path_match.group(1)
             mapped_params["catalog_ids"] = [catalog_id]
 
-        # Define the missing IDs parameters
-        missing_ids_params = ["catalog", "status"]
-
         # Match the parameters in the URL
-        params = re.findall(r"([a-z_]+)(\[\])?=([a-zA-Z 0-9._À-ú+%]*)&?", decoded_url)
+        params = PARAM_PATTERN.findall(decoded_url)
         if not isinstance(matched_params.groups(), tuple):
             raise InvalidUrlException
 
@@ -38,7 +62,7 @@ def parse_url_to_params(url: str):
 
             # Handle array parameters
             if is_array:
-                if param_name in missing_ids_params:
+                if param_name in MISSING_IDS_PARAMS:
                     param_name = f"{param_name}_id"
 
                 key_name = param_name if param_name.endswith("s") else f"{param_name}s"
@@ -51,22 +75,92 @@ def parse_url_to_params(url: str):
             else:
                 mapped_params[param_name] = param_value
 
-        # Construct the final parameters as a query string
-        final_params = {}
-        for key, value in mapped_params.items():
-            if isinstance(value, list):
-                final_params[key] = ",".join(value)
-            else:
-                final_params[key] = value
-
-        # Remove time, page and per_page parameters from final dictionary
-        [
-            final_params.pop(key)
-            for key in ["time", "page", "per_page"]
-            if key in final_params.keys()
-        ]
-
-        return final_params
+        # Construct the final parameters, without time, page and per_page
+        return tuple(
+            (key, ",".join(value) if isinstance(value, list) else value)
+            for key, value in mapped_params.items()
+            if key not in PAGINATION_PARAMS
+        )
     except Exception as e:
         print(e)
         raise InvalidUrlException
+
+
+def join_ids(value) -> str:
+    """
+    Format an ID filter (a single ID, a list of IDs or a comma separated string) as
+    the comma separated list expected by the API.
+    """
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+
+def _canonical_ids(value) -> str:
+    ids = {part.strip() for part in join_ids(value).split(",")} - {""}
+    numeric = sorted({int(i) for i in ids if i.isdigit()})
+    return ",".join([*map(str, numeric), *sorted(i for i in ids if not i.isdigit())])
+
+
+def _canonical_number(value) -> str:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def search_key(url: str = None, **params) -> str:
+    """
+    Return a canonical identity for a search: the query string of its filters with
+    pagination parameters and empty values dropped, ID lists deduplicated and sorted
+    and keys sorted. Searches returning the same results get the same key however
+    they were spelled, so it can be used as a cache or dedup key.
+
+    Takes search() keyword arguments, a catalog URL, or both (URL filters win, as in
+    search()).
+
+    Example:
+        search_key(catalog_ids=[5, 2]) == search_key(catalog_ids="2,5")
+    """
+    if url:
+        params.update(parse_url_to_params(url))
+    canonical = []
+    for key, value in params.items():
+        if key in PAGINATION_PARAMS or value is None or value == "":
+            continue
+        if key.endswith("_ids"):
+            value = _canonical_ids(value)
+            if not value:
+                continue
+        elif key in NUMERIC_PARAMS:
+            value = _canonical_number(value)
+        else:
+            value = str(value)
+        canonical.append((key, value))
+    return urlencode(sorted(canonical), safe=",+")
+
+
+@contextlib.contextmanager
+def atomic_write(path: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+    """
+    Open a file that replaces `path` when the block exits. The content goes to a
+    temporary file next to it, renamed over `path` at the end, so readers in this
+    or other processes never see a partial file; if the block raises, `path` is
+    left as it was. Text files default to UTF-8.
+
+    Example:
+        with atomic_write("state.json") as f:
+            json.dump(state, f)
+    """
+    if "b" not in mode:
+        kwargs.setdefault("encoding", "utf-8")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from queue import Queue
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .pagination import record_id
+from .projection import Projection
+from .utils import atomic_write, search_key
+
+logger = logging.getLogger(__name__)
+
+
+def without_order(url: str) -> str:
+    """
+    Drop the `order` parameter of a catalog URL: search() lets the URL parameters
+    override its own, so a saved search sorted by relevance or price would replace
+    the newest_first order the watcher relies on.
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "order"]
+    return urlunsplit(parts._replace(query=urlencode(query, safe="[]+,")))
+
+
+@dataclass(slots=True)
+class WatchedQuery:
+    key: str
+    filters: Dict[str, Any]
+    high_water: Optional[int] = None  # highest item id already seen
+    polled_at: float = 0.0
+
+
+class ListingWatcher:
+    def __init__(
+        self,
+        vinted,
+        interval: float = 60.0,
+        max_pages: int = 5,
+        per_page: int = 96,
+        stop_after_known: int = 3,
+        projection: Projection = None,
+        state_path: str = None,
+    ) -> None:
+        """
+        Follow new listings of one or more searches by polling them with
+        order="newest_first".
+
+        For every query the watcher keeps a high-water mark, the highest item id seen
+        so far (ids grow with the listing time). Each poll walks the results lazily
+        and stops as soon as `stop_after_known` consecutive items are already known,
+        so a page is only requested when the previous one was all new: the polling
+        cost follows the number of new listings, not the size of the results. A few
+        known items in a row are tolerated because bumped or promoted listings with
+        old ids show up among the new ones.
+
+        The first poll of a query only sets its high-water mark. With `state_path`
+        the marks are persisted as JSON and a restarted watcher picks up where it
+        stopped, capped to `max_pages` pages of backlog.
+
+        Args:
+            vinted: Vinted client issuing the searches
+            interval: Seconds between two polls of all the queries
+            max_pages: Maximum pages walked by one poll of a query
+            per_page: Items per page
+            stop_after_known: Consecutive known items ending a poll
+            projection: Optional projection of the emitted items ("id" is added)
+            state_path: Optional JSON file persisting the high-water marks
+
+        Example:
+            watcher = ListingWatcher(vinted, interval=120, state_path="watch_it.json")
+            watcher.watch(query="funko pop")
+            watcher.run(on_new=lambda key, item: print(key, item.id))
+        """
+        if projection is not None and not isinstance(projection, type) and "id" not in projection:
+            projection = ["id", *projection]
+        self.vinted = vinted
+        self.interval = interval
+        self.max_pages = max_pages
+        self.per_page = per_page
+        self.stop_after_known = stop_after_known
+        self.projection = projection
+        self.state_path = state_path
+
+        self.queries: Dict[str, WatchedQuery] = {}
+        self._saved_marks: Dict[str, dict] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        if state_path is not None and os.path.exists(state_path):
+            try:
+                with open(state_path, encoding="utf-8") as f:
+                    self._saved_marks = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable watcher state %s: %s", state_path, e)
+
+    def watch(self, **search_kwargs) -> str:
+        """
+        Start following a search, given with the search() filters (or url=...).
+        Returns the key identifying it in the results of poll(). Any order, explicit
+        or in the URL, is replaced by newest_first.
+        """
+        search_kwargs.pop("order", None)
+        if search_kwargs.get("url"):
+            search_kwargs["url"] = without_order(search_kwargs["url"])
+        key = search_key(**search_kwargs)
+        saved = self._saved_marks.get(key, {})
+        with self._lock:
+            self.queries.setdefault(
+                key,
+                WatchedQuery(
+                    key=key,
+                    filters=search_kwargs,
+                    high_water=saved.get("high_water"),
+                    polled_at=saved.get("polled_at", 0.0),
+                ),
+            )
+        return key
+
+    def unwatch(self, key: str) -> None:
+        with self._lock:
+            self.queries.pop(key, None)
+
+    def poll_query(self, key: str) -> List[Any]:
+        """
+        Return the items listed since the previous poll of a query, newest first.
+        """
+        query = self.queries[key]
+        new_items = []
+        known_streak = 0
+        items = self.vinted.iter_search(
+            order="newest_first",
+            per_page=self.per_page,
+            max_pages=self.max_pages,
+            prefetch=False,
+            projection=self.projection,
+            use_cache=False,
+            **query.filters,
+        )
+        try:
+            for item in items:
+                item_id = record_id(item)
+                if query.high_water is None:
+                    # First poll: the first page only sets the mark
+                    new_items.append(item)
+                    if len(new_items) >= self.per_page:
+                        break
+                    continue
+                if item_id is None or item_id <= query.high_water:
+                    known_streak += 1
+                    if known_streak >= self.stop_after_known:
+                        break
+                    continue
+                known_streak = 0
+                new_items.append(item)
+        finally:
+            items.close()
+
+        first_poll = query.high_water is None
+        ids = [i for i in map(record_id, new_items) if i is not None]
+        if ids:
+            query.high_water = max(ids + [query.high_water or 0])
+        query.polled_at = time.time()
+        if first_poll:
+            logger.info("Watching %s from item %s", key, query.high_water)
+            return []
+        logger.debug("%s new items for %s", len(new_items), key)
+        return new_items
+
+    def poll(self) -> Dict[str, List[Any]]:
+        """
+        Poll every watched query once and return the new items per query key.
+        """
+        results = {}
+        for key in list(self.queries):
+            try:
+                results[key] = self.poll_query(key)
+            except Exception as e:
+                logger.warning("Polling %s failed: %s", key, e)
+                results[key] = []
+        self.save()
+        return results
+
+    def run(
+        self,
+        on_new: Callable[[str, Any], None] = None,
+        queue: Queue = None,
+        max_polls: int = None,
+    ) -> None:
+        """
+        Poll every `interval` seconds until stop() (or `max_polls` polls), passing
+        each new item to `on_new(key, item)` and/or putting `(key, item)` on `queue`.
+        """
+        polls = 0
+        self._stop.clear()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            for key, items in self.poll().items():
+                for item in reversed(items):  # oldest first
+                    if on_new is not None:
+                        on_new(key, item)
+                    if queue is not None:
+                        queue.put((key, item))
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(
+        self, on_new: Callable[[str, Any], None] = None, queue: Queue = None
+    ) -> None:
+        """
+        Run the watcher on a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self.run,
+            kwargs={"on_new": on_new, "queue": queue},
+            name="vinted-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def save(self) -> None:
+        if self.state_path is None:
+            return
+        with self._lock:
+            self._saved_marks.update(
+                {
+                    key: {"high_water": query.high_water, "polled_at": query.polled_at}
+                    for key, query in self.queries.items()
+                }
+            )
+            state = dict(self._saved_marks)
+        with atomic_write(self.state_path) as f:
+            json.dump(state, f)